@@ -0,0 +1,345 @@
+# Script: benchmark.py - NConvert-Batch Benchmark Harness
+"""
+Reproducible benchmark for the conversion engine in program.py.
+Generates a synthetic source tree, swaps nconvert for a local stand-in with
+configurable latency, CPU burn and failure rate, runs the engine and prints
+a JSON report (scan time, files/sec, latency percentiles, peak RSS).
+
+Example:
+    python benchmark.py --files 2000 --depth 3 --workers 8 --latency 20 --output bench.json
+"""
+import os
+import sys
+import time
+import json
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+import atexit
+import contextlib
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+
+# Magic bytes written by the stand-in so outputs look like real images
+STAND_IN_MAGIC = {
+    "jpeg": b"\xff\xd8\xff\xe0",
+    "png": b"\x89PNG\r\n\x1a\n",
+    "bmp": b"BM",
+    "gif": b"GIF89a",
+    "tiff": b"II*\x00",
+    "webp": b"RIFF\x00\x00\x00\x00WEBPVP8 ",
+    "avif": b"\x00\x00\x00\x1cftypavif",
+    "psd": b"8BPS",
+    "svg": b"<?xml",
+    "pspimage": b"Paint Shop Pro Image File\n\x1a"
+}
+
+# ─── Stand-in nconvert ──────────────────────────────────────────────────────────
+
+def burn_cpu(milliseconds):
+    deadline = time.perf_counter() + milliseconds / 1000.0
+    x = 0
+    while time.perf_counter() < deadline:
+        x = (x * 31 + 7) % 1000003
+    return x
+
+def stand_in_main(args):
+    """Minimal nconvert imitation: understands -out, -o (with % pattern) and inputs."""
+    latency = float(os.environ.get("BENCH_LATENCY_MS", "0"))
+    latency_per_mb = float(os.environ.get("BENCH_LATENCY_PER_MB_MS", "0"))
+    cpu_ms = float(os.environ.get("BENCH_CPU_MS", "0"))
+    fail_rate = float(os.environ.get("BENCH_FAIL_RATE", "0"))
+
+    out_format, pattern, inputs = "jpeg", None, []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "-out" and i + 1 < len(args):
+            out_format = args[i + 1].lower()
+            i += 2
+        elif arg == "-o" and i + 1 < len(args):
+            pattern = args[i + 1]
+            i += 2
+        elif arg.startswith("-"):
+            i += 1
+        else:
+            inputs.append(arg)
+            i += 1
+
+    # Failures are a deterministic function of the file name, so reruns agree
+    exit_code = 0
+    for infile in inputs:
+        rng = random.Random(os.path.basename(infile))
+        try:
+            size_mb = os.path.getsize(infile) / (1024 * 1024)
+        except OSError:
+            sys.stderr.write(f"Error: can't open {infile}\n")
+            exit_code = 1
+            continue
+        time.sleep((latency + latency_per_mb * size_mb) / 1000.0)
+        burn_cpu(cpu_ms)
+        if rng.random() < fail_rate:
+            sys.stderr.write(f"Error: can't read {infile}\n")
+            exit_code = 1
+            continue
+        name = os.path.splitext(os.path.basename(infile))[0]
+        outfile = pattern.replace("%", name) if pattern and "%" in pattern else pattern
+        if not outfile:
+            outfile = os.path.splitext(infile)[0] + f".{out_format}"
+        with open(outfile, "wb") as f:
+            f.write(STAND_IN_MAGIC.get(out_format, b"") + b"\x00" * 64)
+        print(f"Conversion of {infile} into {outfile} OK")
+    return exit_code
+
+def write_stand_in(directory):
+    """Create an executable wrapper that runs this script in stand-in mode."""
+    if os.name == 'nt':
+        launcher = directory / "nconvert-stand-in.cmd"
+        launcher.write_text(
+            f'@"{sys.executable}" "{Path(__file__).absolute()}" --stand-in %*\r\n',
+            encoding="utf-8"
+        )
+    else:
+        launcher = directory / "nconvert-stand-in"
+        launcher.write_text(
+            f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).absolute()}" --stand-in "$@"\n',
+            encoding="utf-8"
+        )
+        launcher.chmod(0o755)
+    return launcher
+
+# ─── Synthetic Tree ─────────────────────────────────────────────────────────────
+
+def generate_tree(root, files, depth, fanout, size_min, size_max, extension, seed,
+                  large_files=0, large_size=0):
+    """
+    Spread `files` source files evenly over a directory tree of the given
+    shape, plus `large_files` files of `large_size` bytes in the deepest
+    folders, which the scanner reaches last.
+    """
+    rng = random.Random(seed)
+    directories = [root]
+    level = [root]
+    for _ in range(depth):
+        level = [parent / f"dir{i:02d}" for parent in level for i in range(fanout)]
+        directories.extend(level)
+    for directory in directories:
+        directory.mkdir(parents=True, exist_ok=True)
+    total_bytes = 0
+    for n in range(files):
+        size = rng.randint(size_min, size_max)
+        path = directories[n % len(directories)] / f"image{n:06d}.{extension}"
+        path.write_bytes(rng.randbytes(size))
+        total_bytes += size
+    for n in range(large_files):
+        path = directories[-1 - n % len(directories)] / f"large{n:04d}.{extension}"
+        path.write_bytes(rng.randbytes(large_size))
+        total_bytes += large_size
+    return len(directories), total_bytes
+
+# ─── Measurements ───────────────────────────────────────────────────────────────
+
+def peak_rss_mb():
+    try:
+        import resource
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return {
+            "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor, 1),
+            "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor, 1)
+        }
+    except ImportError:
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return {"self": getattr(info, "peak_wset", info.rss) / (1024 * 1024), "children": None}
+        except Exception:
+            return {"self": None, "children": None}
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SCRIPT_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+def load_program(data_dir):
+    """Import program.py with its console chatter sent to stderr and its data under data_dir."""
+    sys.path.insert(0, str(SCRIPT_DIR))
+    with contextlib.redirect_stdout(sys.stderr):
+        import program
+    # The benchmark must never overwrite the user's saved session
+    atexit.unregister(program.save_last_session)
+    program.DATA_DIR = data_dir
+    program.SETTINGS_FILE = data_dir / "persistent.json"
+    return program
+
+def run_benchmark(args):
+    work_dir = Path(tempfile.mkdtemp(prefix="nconvert-bench-"))
+    try:
+        tree = work_dir / "tree"
+        data_dir = work_dir / "data"
+        data_dir.mkdir()
+        dir_count, total_bytes = generate_tree(
+            tree, args.files, args.depth, args.fanout,
+            args.size_min, args.size_max, args.format_from.lower(), args.seed,
+            args.large_files, args.large_size
+        )
+
+        os.environ["BENCH_LATENCY_MS"] = str(args.latency)
+        os.environ["BENCH_LATENCY_PER_MB_MS"] = str(args.latency_per_mb)
+        os.environ["BENCH_CPU_MS"] = str(args.cpu_ms)
+        os.environ["BENCH_FAIL_RATE"] = str(args.fail_rate)
+
+        program = load_program(data_dir)
+        program.nconvert_path = str(write_stand_in(work_dir))
+        unknown = [policy for policy in args.schedule if policy not in program.SCHEDULE_POLICIES]
+        if unknown or not args.schedule:
+            raise SystemExit(f"--schedule must list some of: {', '.join(program.SCHEDULE_POLICIES)}")
+
+        options = program.current_options()
+        options.update({
+            "folder": str(tree),
+            "format_from": args.format_from.upper(),
+            "format_to": args.format_to.upper(),
+            "delete": False,
+            "beep": False,
+            "workers": args.workers,
+            "batch_size": args.batch_size,
+            "skip_up_to_date": False
+        })
+
+        scan_start = time.perf_counter()
+        scanned = sum(1 for _ in program.find_files_to_convert(options))
+        scan_seconds = time.perf_counter() - scan_start
+
+        # Collect per-file durations as the workers report them
+        latencies = []
+        process_batch = program.process_batch
+
+        def timed_process_batch(batch, batch_options, targets=None):
+            results = process_batch(batch, batch_options, targets)
+            latencies.extend(result["duration"] for result in results)
+            return results
+
+        program.process_batch = timed_process_batch
+        runs = {}
+        for policy in args.schedule:
+            latencies.clear()
+            options["schedule"] = policy
+            stats = None
+            run_start = time.perf_counter()
+            with contextlib.redirect_stdout(sys.stderr):
+                for _, update in program.run_conversion(options):
+                    stats = update or stats
+            run_seconds = time.perf_counter() - run_start
+            processed = (stats["done"] + stats["failed"]) if stats else 0
+            runs[policy] = {
+                "schedule": policy,
+                "seconds": round(run_seconds, 4),
+                "files": processed,
+                "succeeded": stats["done"] if stats else 0,
+                "failed": stats["failed"] if stats else 0,
+                "files_per_sec": round(processed / run_seconds, 2) if run_seconds > 0 else None,
+                "makespan_seconds": round(stats["makespan"], 4) if stats and stats["makespan"] else None,
+                "makespan_lower_bound_seconds": round(stats["makespan_lower_bound"], 4) if stats else None,
+                "latency_ms": {
+                    name: round(program.percentile(latencies, pct) * 1000, 2) if latencies else None
+                    for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+                }
+            }
+        program.process_batch = process_batch
+
+        report = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "params": {
+                "files": args.files,
+                "directories": dir_count,
+                "source_bytes": total_bytes,
+                "depth": args.depth,
+                "fanout": args.fanout,
+                "size_min": args.size_min,
+                "size_max": args.size_max,
+                "workers": args.workers,
+                "batch_size": args.batch_size,
+                "latency_ms": args.latency,
+                "latency_per_mb_ms": args.latency_per_mb,
+                "cpu_ms": args.cpu_ms,
+                "fail_rate": args.fail_rate,
+                "large_files": args.large_files,
+                "large_size": args.large_size,
+                "seed": args.seed
+            },
+            "scan": {
+                "seconds": round(scan_seconds, 4),
+                "files": scanned,
+                "files_per_sec": round(scanned / scan_seconds, 1) if scan_seconds > 0 else None
+            },
+            "conversion": runs[args.schedule[0]],
+            "peak_rss_mb": peak_rss_mb()
+        }
+        if len(runs) > 1:
+            # Speed-up of each policy's makespan over the first one listed
+            baseline = runs[args.schedule[0]]["makespan_seconds"]
+            report["schedules"] = list(runs.values())
+            report["makespan_speedup"] = {
+                policy: round(baseline / run["makespan_seconds"], 3)
+                if baseline and run["makespan_seconds"] else None
+                for policy, run in runs.items()
+            }
+        return report
+    finally:
+        if args.keep:
+            print(f"Kept benchmark files in {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+# ─── Entry Point ────────────────────────────────────────────────────────────────
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the NConvert-Batch conversion engine.")
+    parser.add_argument("--files", type=int, default=500, help="number of source files")
+    parser.add_argument("--depth", type=int, default=2, help="directory levels below the root")
+    parser.add_argument("--fanout", type=int, default=4, help="sub-directories per directory")
+    parser.add_argument("--size-min", type=int, default=1024, help="smallest source file in bytes")
+    parser.add_argument("--size-max", type=int, default=64 * 1024, help="largest source file in bytes")
+    parser.add_argument("--from", dest="format_from", default="PSPIMAGE")
+    parser.add_argument("--to", dest="format_to", default="JPEG", help="target format(s), comma separated")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1, help="files per nconvert call")
+    parser.add_argument("--latency", type=float, default=10.0, help="stand-in delay per file (ms)")
+    parser.add_argument("--latency-per-mb", type=float, default=0.0, help="extra stand-in delay per MB (ms)")
+    parser.add_argument("--cpu-ms", type=float, default=0.0, help="stand-in CPU burn per file (ms)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of files the stand-in fails")
+    parser.add_argument("--large-files", type=int, default=0, help="extra large files in the deepest folders")
+    parser.add_argument("--large-size", type=int, default=8 * 1024 * 1024, help="size of each large file in bytes")
+    parser.add_argument("--schedule", default="discovery",
+                        type=lambda text: [name.strip() for name in text.split(",") if name.strip()],
+                        help="processing order(s) to compare, comma separated: discovery, largest, locality")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the generated tree")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--stand-in"]:
+        return stand_in_main(argv[1:])
+    args = parse_args(argv)
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
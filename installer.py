@@ -8,6 +8,7 @@ import sys
 import subprocess
 import platform
 import zipfile
+import fnmatch
 import shutil
 import urllib.request
 import urllib.error
@@ -15,12 +16,20 @@ from pathlib import Path
 import tempfile
 import time
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # Global Constants
 NCONVERT_URLS = {  # Download URLs for NConvert
     'x64': 'https://download.xnview.com/NConvert-win64.zip',
     'x32': 'https://download.xnview.com/NConvert-win.zip'
 }
+NCONVERT_SHA256 = {  # Pin a known release here; None trusts and records the first download
+    'x64': None,
+    'x32': None
+}
+URL_OVERRIDE_ENV = "NCONVERT_URL"        # e.g. a local mirror
+SHA256_OVERRIDE_ENV = "NCONVERT_SHA256"
 
 # All application packages with pinned versions
 INSTALL_PACKAGES = [
@@ -103,6 +112,13 @@ HEADER_CHAR = "="
 SEPARATOR_CHAR = "-"
 MAX_RETRIES = 4           # slightly more forgiving
 RETRY_DELAY = 4           # give server/network more time to recover
+DOWNLOAD_PARTS = 4        # byte ranges fetched at once when the server allows it
+DOWNLOAD_PARALLEL_MIN = 2 * 1024 * 1024  # smaller downloads use one stream
+DOWNLOAD_CHUNK = 64 * 1024
+EXTRACT_PREFIX = "NConvert/"  # archive folder holding the files that get installed
+EXTRACT_CHUNK = 1024 * 1024
+EXTRACT_SKIP = ["*.txt", "*.pdf", "*.htm", "*.html", "*.chm", "doc/*", "docs/*", "sample/*", "samples/*"]
+EXTRACT_KEEP = ["license*", "licence*"]  # NConvert's terms stay next to it
 
 # Default settings for persistent.json
 DEFAULT_SESSION = {
@@ -110,7 +126,26 @@ DEFAULT_SESSION = {
     "last_from": "PSPIMAGE",
     "last_to": "JPEG",
     "last_delete": False,
-    "beep_on_complete": False
+    "beep_on_complete": False,
+    "max_workers": os.cpu_count() or 1,
+    "batch_size": 1,
+    "skip_up_to_date": False,
+    "manifest_hash": False,
+    "scan_include": "",
+    "scan_exclude": ".git, Thumbs.db, $RECYCLE.BIN, System Volume Information",
+    "scan_max_depth": 0,
+    "follow_symlinks": False,
+    "timeout_floor": 5,
+    "timeout_ceiling": 600,
+    "dedup": False,
+    "dedup_link": "hardlink",
+    "adaptive_workers": False,
+    "min_workers": 1,
+    "low_memory_mb": 1024,
+    "schedule": "discovery",
+    "staging": False,
+    "staging_cap_mb": 4096,
+    "watch_poll_seconds": 10
 }
 
 class NConvertInstaller:
@@ -120,6 +155,7 @@ class NConvertInstaller:
         self.data_dir = self.script_dir / "data"
         self.session_file = self.data_dir / "persistent.json"
         self.workspace_dir = self.script_dir / "temp"
+        self.cache_dir = self.data_dir / "cache"
 
     def clear_screen(self):
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -206,6 +242,10 @@ class NConvertInstaller:
                 print(f"\nDownload attempt {retry_count + 1}/{MAX_RETRIES} - {attempt_type} download...")
 
                 with urllib.request.urlopen(req, timeout=30) as response:
+                    if local_size > 0 and response.status != 206:
+                        # The server sent the whole file, so the partial one is of no use
+                        print("Server does not support resuming, starting over")
+                        local_size = 0
                     total_size = int(response.getheader('Content-Length', 0)) + local_size
                     mode = 'ab' if local_size > 0 else 'wb'
 
@@ -255,44 +295,170 @@ class NConvertInstaller:
 
         return False
 
-    def extract_zip(self, zip_path, extract_to):
+    def download_parallel(self, url, destination):
+        """
+        Fetch url in DOWNLOAD_PARTS byte ranges at once. Each range goes to its
+        own .partN file, so a failed run resumes every range where it stopped.
+        Returns None when the server does not support ranges or the file is
+        small, so the caller can use download_file instead.
+        """
         try:
-            print(f"Extracting: {zip_path.name}")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                if zip_ref.testzip() is not None:
-                    self.print_status("Corrupted ZIP file", success=False)
-                    return False
-                zip_ref.extractall(extract_to)
-            self.print_status("Extraction completed")
-            return True
-        except Exception as e:
-            self.print_status(f"Extraction error: {e}", success=False)
+            req = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+            with urllib.request.urlopen(req, timeout=30) as response:
+                content_range = response.getheader("Content-Range", "")
+                if response.status != 206 or "/" not in content_range:
+                    return None
+                total_size = int(content_range.rsplit("/", 1)[1])
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+        if total_size < DOWNLOAD_PARALLEL_MIN:
+            return None
+
+        step = -(-total_size // DOWNLOAD_PARTS)
+        ranges = [(start, min(start + step, total_size) - 1) for start in range(0, total_size, step)]
+        parts = [destination.with_name(f"{destination.name}.part{index}") for index in range(len(ranges))]
+        received = [0] * len(ranges)
+        print(f"\nDownloading {total_size / (1024*1024):.1f} MB in {len(ranges)} parallel ranges...")
+
+        def fetch(index):
+            start, end = ranges[index]
+            part = parts[index]
+            for attempt in range(MAX_RETRIES):
+                have = part.stat().st_size if part.exists() else 0
+                received[index] = have
+                if have >= end - start + 1:
+                    return True
+                try:
+                    req = urllib.request.Request(url, headers={"Range": f"bytes={start + have}-{end}"})
+                    with urllib.request.urlopen(req, timeout=30) as response:
+                        if response.status != 206:
+                            raise ConnectionError(f"range request answered with {response.status}")
+                        with open(part, 'ab') as f:
+                            while True:
+                                chunk = response.read(DOWNLOAD_CHUNK)
+                                if not chunk:
+                                    break
+                                f.write(chunk)
+                                received[index] += len(chunk)
+                except Exception as e:
+                    print(f"\nRange {index + 1} failed: {e}")
+                    if attempt + 1 < MAX_RETRIES:
+                        time.sleep(RETRY_DELAY)
+            return part.exists() and part.stat().st_size == end - start + 1
+
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            pending = {pool.submit(fetch, index) for index in range(len(ranges))}
+            futures = set(pending)
+            while pending:
+                _, pending = wait(pending, timeout=0.5)
+                downloaded_bytes = sum(received)
+                percent = (downloaded_bytes * 100) // total_size
+                print(f"\rProgress: {percent:3d}%  ({downloaded_bytes/(1024*1024):6.1f}/{total_size/(1024*1024):.1f} MB)", end='')
+            print()
+            if not all(future.result() for future in futures):
+                print("Some ranges did not finish, the next run resumes them")
+                return False
+
+        # Join the ranges, then drop the parts
+        joined = destination.with_name(destination.name + ".join")
+        with open(joined, 'wb') as out:
+            for part in parts:
+                with open(part, 'rb') as f:
+                    shutil.copyfileobj(f, out, DOWNLOAD_CHUNK * 16)
+        os.replace(joined, destination)
+        for part in parts:
+            part.unlink(missing_ok=True)
+        print("Download completed successfully ✓")
+        return True
+
+    @staticmethod
+    def sha256_file(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def verify_archive(self, path, expected):
+        """
+        Check path against the expected SHA-256; with none given the hash is
+        recorded in a .sha256 file next to it for later checks of the cache.
+        """
+        actual = self.sha256_file(path)
+        if expected and actual != expected:
+            self.print_status(f"SHA-256 mismatch for {path.name}: expected {expected}, got {actual}", success=False)
             return False
+        if expected:
+            self.print_status(f"SHA-256 verified: {actual}")
+        else:
+            print(f"No pinned SHA-256 for this download, recorded {actual}")
+        path.with_name(path.name + ".sha256").write_text(actual + "\n", encoding="utf-8")
+        return True
 
-    def move_nconvert_files(self, source_dir):
-        nconvert_dir = source_dir / "NConvert"
-        if not nconvert_dir.exists():
-            self.print_status("NConvert directory not found in extracted files", success=False)
+    def cached_archive(self, zip_path, expected):
+        """True when the cache already holds a copy matching its pinned or recorded hash."""
+        if not zip_path.exists():
+            return False
+        sidecar = zip_path.with_name(zip_path.name + ".sha256")
+        if not expected and sidecar.exists():
+            expected = sidecar.read_text(encoding="utf-8").strip().lower()
+        if not expected:
+            return False
+        if self.sha256_file(zip_path) != expected:
+            self.print_status(f"Cached {zip_path.name} does not match its SHA-256, downloading again", success=False)
+            zip_path.unlink(missing_ok=True)
             return False
+        self.print_status(f"Using cached {zip_path.name} (SHA-256 verified)")
+        return True
+
+    def extract_nconvert(self, zip_path):
+        """
+        Stream the members NConvert needs out of the archive's NConvert folder
+        straight into the program folder, in one pass. zipfile checks each
+        member's CRC as it is read, and a member only takes its real name once
+        it has been read in full. Docs and samples are skipped.
+        """
+        started = time.time()
+        print(f"Extracting: {zip_path.name}")
+        extracted = skipped = 0
+        temp = None
         try:
-            moved_count = 0
-            for item in nconvert_dir.iterdir():
-                destination = self.script_dir / item.name
-                if destination.exists():
-                    if destination.is_file():
-                        destination.unlink()
-                    else:
-                        shutil.rmtree(destination)
-                shutil.move(str(item), str(destination))
-                moved_count += 1
-                print(f"Moved: {item.name}")
-            if nconvert_dir.exists():
-                nconvert_dir.rmdir()
-            self.print_status(f"Moved {moved_count} items successfully")
-            return True
-        except Exception as e:
-            self.print_status(f"Error moving files: {e}", success=False)
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                members = [info for info in zip_ref.infolist()
+                           if info.filename.startswith(EXTRACT_PREFIX) and not info.is_dir()]
+                if not members:
+                    self.print_status("NConvert directory not found in the archive", success=False)
+                    return False
+                for info in members:
+                    relative = info.filename[len(EXTRACT_PREFIX):]
+                    name = relative.lower()
+                    if (any(fnmatch.fnmatch(name, pattern) for pattern in EXTRACT_SKIP)
+                            and not any(fnmatch.fnmatch(Path(name).name, pattern) for pattern in EXTRACT_KEEP)):
+                        skipped += 1
+                        continue
+                    if ".." in Path(relative).parts or Path(relative).is_absolute():
+                        print(f"Skipped unsafe path: {info.filename}")
+                        skipped += 1
+                        continue
+                    destination = self.script_dir / relative
+                    destination.parent.mkdir(parents=True, exist_ok=True)
+                    temp = destination.with_name(destination.name + ".extracting")
+                    with zip_ref.open(info) as source, open(temp, 'wb') as target:
+                        shutil.copyfileobj(source, target, EXTRACT_CHUNK)
+                    os.replace(temp, destination)
+                    temp = None
+                    extracted += 1
+                    print(f"Extracted: {relative}")
+        except (zipfile.BadZipFile, OSError) as e:
+            if temp is not None:
+                temp.unlink(missing_ok=True)
+            self.print_status(f"Extraction error: {e}", success=False)
             return False
+        self.print_status(
+            f"Extracted {extracted} files in {time.time() - started:.2f}s "
+            f"({skipped} docs and samples skipped)"
+        )
+        return True
 
     def install_nconvert(self):
         if self.nconvert_exe.exists():
@@ -301,30 +467,38 @@ class NConvertInstaller:
         
         print("NConvert not found, attempting download...")
         architecture = self.prompt_architecture()
-        url = NCONVERT_URLS[architecture]
+        url = os.environ.get(URL_OVERRIDE_ENV) or NCONVERT_URLS[architecture]
+        expected = (os.environ.get(SHA256_OVERRIDE_ENV) or NCONVERT_SHA256[architecture] or "").strip().lower()
         zip_name = f"NConvert-win{'64' if architecture == 'x64' else ''}.zip"
-        
-        # Better naming for temp file (easier to recognize when debugging)
-        with tempfile.NamedTemporaryFile(suffix='.zip', prefix='nconvert-', delete=False) as tmp:
-            zip_path = Path(tmp.name)
 
-        success = self.download_file(url, zip_path)
+        # Archives are kept in data/cache, so repeat and offline installs skip the download
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            self.print_status(f"Failed to create cache directory: {e}", success=False)
+            return False
+        zip_path = self.cache_dir / zip_name
+
+        if not self.cached_archive(zip_path, expected):
+            partial = zip_path.with_name(zip_name + ".part")
+            success = self.download_parallel(url, partial)
+            if success is None:
+                success = self.download_file(url, partial)
+            if not success:
+                return False
+            if not self.verify_archive(partial, expected):
+                partial.unlink(missing_ok=True)
+                return False
+            os.replace(partial, zip_path)
+            os.replace(partial.with_name(partial.name + ".sha256"), zip_path.with_name(zip_name + ".sha256"))
 
-        if not success:
+        if not self.extract_nconvert(zip_path):
+            # A broken archive must not be reused from the cache
             zip_path.unlink(missing_ok=True)
+            zip_path.with_name(zip_name + ".sha256").unlink(missing_ok=True)
             return False
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            if not self.extract_zip(zip_path, temp_path):
-                zip_path.unlink(missing_ok=True)
-                return False
-            if not self.move_nconvert_files(temp_path):
-                zip_path.unlink(missing_ok=True)
-                return False
 
-        zip_path.unlink(missing_ok=True)
-        
         if self.nconvert_exe.exists():
             self.print_status("NConvert installation completed")
             return True
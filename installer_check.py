@@ -0,0 +1,263 @@
+# Script: installer_check.py - NConvert-Batch Installer Download Check
+"""
+Drives installer.py's NConvert download against a local stand-in server.
+A synthetic NConvert archive is served over HTTP with optional Range support
+and connections that drop part way through, and install_nconvert() is run
+through NCONVERT_URL into a temp folder. Covers a parallel download resumed
+by a second run, the single-stream fallback, a SHA-256 mismatch and a repeat
+install served from the cache. Prints a JSON report and exits 1 on failure.
+
+Example:
+    python installer_check.py --size-mb 3 --output installer-check.json
+"""
+import os
+import re
+import sys
+import json
+import random
+import shutil
+import zipfile
+import argparse
+import tempfile
+import threading
+import contextlib
+import http.server
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+ARCHIVE_NAME = "NConvert-win64.zip"
+DROP_MIN_BYTES = 1024  # responses smaller than this are never dropped
+
+# ─── Stand-in Server ────────────────────────────────────────────────────────────
+
+class StandInServer:
+    """
+    Serves one archive on 127.0.0.1. With `ranges` off the Range header is
+    ignored (plain 200 responses); with `drop` on, the first response for
+    each start offset is cut off after a third of its body. One-byte range
+    probes are never dropped.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.ranges = True
+        self.drop = False
+        self.requests = []  # Range header of every request, None when absent
+        self.dropped = set()
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                header = self.headers.get("Range")
+                with server.lock:
+                    server.requests.append(header)
+                start, end = 0, len(server.data) - 1
+                match = re.match(r"bytes=(\d+)-(\d*)$", header or "")
+                probe = bool(match and match.group(2) and match.group(1) == match.group(2))
+                if server.ranges and match:
+                    start = int(match.group(1))
+                    end = int(match.group(2)) if match.group(2) else end
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(server.data)}")
+                else:
+                    self.send_response(200)
+                body = server.data[start:end + 1]
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                with server.lock:
+                    drop = (server.drop and not probe and len(body) >= DROP_MIN_BYTES
+                            and start not in server.dropped)
+                    if drop:
+                        server.dropped.add(start)
+                if drop:
+                    self.wfile.write(body[:len(body) // 3])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/{ARCHIVE_NAME}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self, ranges=True, drop=False):
+        with self.lock:
+            self.ranges, self.drop = ranges, drop
+            self.requests.clear()
+            self.dropped.clear()
+
+def build_archive(size, seed):
+    """A zip shaped like NConvert's: the executable, a licence and docs that get skipped."""
+    rng = random.Random(seed)
+    executable = rng.randbytes(size)
+    path = Path(tempfile.mkstemp(suffix=".zip")[1])
+    try:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+            archive.writestr("NConvert/nconvert.exe", executable)
+            archive.writestr("NConvert/license.txt", "Stand-in licence\n")
+            archive.writestr("NConvert/ReadMe.txt", "Stand-in readme\n")
+            archive.writestr("NConvert/doc/usage.htm", "<html></html>\n")
+        return path.read_bytes(), executable
+    finally:
+        path.unlink(missing_ok=True)
+
+# ─── Scenarios ──────────────────────────────────────────────────────────────────
+
+def load_installer():
+    sys.path.insert(0, str(SCRIPT_DIR))
+    import installer
+    installer.RETRY_DELAY = 0.1
+    return installer
+
+def make_installer(installer, site):
+    """An installer working in `site` that never asks for the architecture."""
+    site.mkdir(parents=True, exist_ok=True)
+    instance = installer.NConvertInstaller()
+    instance.script_dir = site
+    instance.nconvert_exe = site / "nconvert.exe"
+    instance.data_dir = site / "data"
+    instance.session_file = instance.data_dir / "persistent.json"
+    instance.workspace_dir = site / "temp"
+    instance.cache_dir = instance.data_dir / "cache"
+    instance.prompt_architecture = lambda: "x64"
+    return instance
+
+def install(installer, site):
+    with contextlib.redirect_stdout(sys.stderr):
+        return make_installer(installer, site).install_nconvert()
+
+def installed_ok(site, executable):
+    exe = site / "nconvert.exe"
+    return (exe.exists() and exe.read_bytes() == executable
+            and (site / "license.txt").exists() and not (site / "ReadMe.txt").exists())
+
+def check_parallel_resume(installer, server, site, executable):
+    """First run loses every range part way and gives up; the second resumes them."""
+    server.reset(drop=True)
+    retries = installer.MAX_RETRIES
+    installer.MAX_RETRIES = 1
+    try:
+        first = install(installer, site)
+    finally:
+        installer.MAX_RETRIES = retries
+    parts = sorted(path.name for path in (site / "data" / "cache").glob("*.part*"))
+    server.reset()
+    second = install(installer, site)
+    step = -(-len(server.data) // installer.DOWNLOAD_PARTS)
+    starts = [int(re.match(r"bytes=(\d+)", header).group(1)) for header in server.requests if header]
+    resumed = [start for start in starts if start % step]
+    return {
+        "passed": not first and bool(parts) and second and bool(resumed) and installed_ok(site, executable),
+        "first_run_ok": first,
+        "parts_left": parts,
+        "second_run_ok": second,
+        "resumed_ranges": len(resumed),
+        "requests": len(server.requests)
+    }
+
+def check_single_stream(installer, server, site, executable):
+    """A server without Range support: one stream, started over after the drop."""
+    server.reset(ranges=False, drop=True)
+    ok = install(installer, site)
+    return {
+        "passed": ok and installed_ok(site, executable) and len(server.dropped) == 1,
+        "install_ok": ok,
+        "dropped": len(server.dropped),
+        "requests": len(server.requests)
+    }
+
+def check_sha256_mismatch(installer, server, site):
+    """A pinned hash that does not match: nothing installed or cached."""
+    server.reset()
+    os.environ[installer.SHA256_OVERRIDE_ENV] = "0" * 64
+    try:
+        ok = install(installer, site)
+    finally:
+        del os.environ[installer.SHA256_OVERRIDE_ENV]
+    cache = site / "data" / "cache"
+    left = sorted(path.name for path in cache.iterdir()) if cache.exists() else []
+    return {
+        "passed": not ok and not (site / "nconvert.exe").exists() and not left,
+        "install_ok": ok,
+        "cache_files": left
+    }
+
+def check_cache_hit(installer, server, site, executable):
+    """A repeat install with the archive cached makes no requests at all."""
+    (site / "nconvert.exe").unlink(missing_ok=True)
+    server.reset()
+    ok = install(installer, site)
+    return {
+        "passed": ok and installed_ok(site, executable) and not server.requests,
+        "install_ok": ok,
+        "requests": len(server.requests)
+    }
+
+def run_checks(args):
+    installer = load_installer()
+    size = args.size_mb * 1024 * 1024
+    if size < installer.DOWNLOAD_PARALLEL_MIN:
+        raise SystemExit(
+            f"--size-mb must be at least {installer.DOWNLOAD_PARALLEL_MIN / (1024 * 1024):.0f} "
+            "for the parallel download to be used"
+        )
+    data, executable = build_archive(size, args.seed)
+    work_dir = Path(tempfile.mkdtemp(prefix="nconvert-installer-check-"))
+    previous_url = os.environ.get(installer.URL_OVERRIDE_ENV)
+    try:
+        with StandInServer(data) as server:
+            os.environ[installer.URL_OVERRIDE_ENV] = server.url
+            results = {
+                "parallel_resume": check_parallel_resume(installer, server, work_dir / "parallel", executable),
+                "single_stream": check_single_stream(installer, server, work_dir / "single", executable),
+                "sha256_mismatch": check_sha256_mismatch(installer, server, work_dir / "mismatch"),
+                "cache_hit": check_cache_hit(installer, server, work_dir / "parallel", executable)
+            }
+        return {
+            "archive_bytes": len(data),
+            "passed": all(result["passed"] for result in results.values()),
+            "scenarios": results
+        }
+    finally:
+        if previous_url is None:
+            os.environ.pop(installer.URL_OVERRIDE_ENV, None)
+        else:
+            os.environ[installer.URL_OVERRIDE_ENV] = previous_url
+        if args.keep:
+            print(f"Kept installer check files in {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+# ─── Entry Point ────────────────────────────────────────────────────────────────
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Check the NConvert download in installer.py against a local server.")
+    parser.add_argument("--size-mb", type=int, default=3, help="size of the stand-in nconvert.exe in MB")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the temp install folders")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    report = run_checks(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    return 0 if report["passed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
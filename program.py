@@ -6,21 +6,28 @@ print("Starting Imports...")
 import os
 import sys
 import time
-import gradio as gr
-import webbrowser
-from threading import Timer, Thread
+_startup_mark = time.perf_counter()  # start of the first --profile-startup phase
+from threading import Timer, Thread, Lock, Event, Condition
 import subprocess
-import asyncio
-import psutil
 import socket
 from pathlib import Path
 import json
-from tkinter import filedialog
-import winsound
+import sqlite3
+import hashlib
+import shutil
+import fnmatch
+import queue
+import csv
+import heapq
+from collections import deque
 import platform
 import ctypes
 import signal
 import atexit
+import argparse
+import select
+import struct
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 
 print("..Imports Completed.")
 
@@ -28,6 +35,24 @@ print("Initializing Program...")
 # ─── Global References ──────────────────────────────────────────────────────────
 global_demo = None
 _shutdown_requested = False
+PROFILE_STARTUP = "--profile-startup" in sys.argv[1:]
+_startup_phases = []
+
+def mark_startup(phase):
+    """Record the time since the previous mark as one --profile-startup phase."""
+    global _startup_mark
+    now = time.perf_counter()
+    _startup_phases.append((phase, now - _startup_mark))
+    _startup_mark = now
+
+def print_startup_profile():
+    print("\nStartup profile:")
+    for phase, seconds in _startup_phases:
+        print(f"  {phase:<28}{seconds * 1000:9.1f} ms")
+    total = sum(seconds for _, seconds in _startup_phases)
+    print(f"  {'total':<28}{total * 1000:9.1f} ms\n")
+
+mark_startup("standard library imports")
 
 # ─── OS Detection & Compatibility ───────────────────────────────────────────────
 
@@ -58,8 +83,71 @@ print(f"Detected OS: {WINDOWS_VERSION or 'Non-Windows'}")
 workspace_path = os.path.abspath(os.path.join(".", "temp"))
 DATA_DIR = Path(__file__).parent / "data"
 SETTINGS_FILE = DATA_DIR / "persistent.json"
+MANIFEST_FILE = DATA_DIR / "manifest.db"
+REPORTS_DIR = DATA_DIR / "reports"
+JOBS_FILE = DATA_DIR / "jobs.json"
+LOGS_DIR = DATA_DIR / "logs"
+JOURNAL_DIR = DATA_DIR / "journal"
+PID_FILE = DATA_DIR / "program.pid"
+STAGING_DIR = Path(workspace_path) / "staging"
 nconvert_path = str(Path(__file__).parent / "nconvert.exe")
+TIMEOUT_STARTUP = 3.0        # seconds granted to every nconvert launch
+TIMEOUT_SAFETY_FACTOR = 4.0  # allowance over the expected conversion time
+TIMEOUT_RETRY_FACTOR = 4.0   # the single retry gets this much longer
+DEFAULT_THROUGHPUT = 1024 * 1024  # bytes/sec assumed before anything is measured
+THROUGHPUT_SMOOTHING = 0.2   # weight of each new observation in the running average
+MAX_COMMAND_CHARS = 30000    # stay below the Windows 32k command line limit
+MTIME_SLACK = 2.0            # FAT/SMB timestamps can lag by up to 2 seconds
+PROGRESS_UPDATE_INTERVAL = 0.5   # seconds between streamed UI updates
+PROGRESS_BAR_WIDTH = 30
+LOG_TAIL_LINES = 200         # recent log lines kept in memory and shown in the UI
+LOG_PAGE_LINES = 100         # lines per page in the log viewer
+LOG_KEEP_FILES = 50          # run logs kept in data/logs, oldest removed first
+REPORT_KEEP_FILES = 50       # run reports kept in data/reports, oldest removed first
+MANIFEST_FLUSH_ROWS = 500    # manifest rows buffered before one bulk insert
+MANIFEST_KEEP_RUNS = 200     # run history entries kept by compaction
+HASH_CHUNK_SIZE = 1024 * 1024
+STDERR_EXCERPT_CHARS = 200
+REPORT_SLOWEST = 20          # slowest files listed in the run report
+SCAN_WORKERS = 8             # threads listing directories in parallel
+SCAN_QUEUE_BATCHES = 64      # batches buffered between the scanner and the workers
+DEDUP_LINK_MODES = ["hardlink", "copy"]
+SCHEDULE_POLICIES = ["discovery", "largest", "locality"]
+SCHEDULE_WINDOW = 20000      # batches buffered for reordering by the largest/locality policies
+RESOURCE_SAMPLE_INTERVAL = 1.0   # seconds between system load samples for adaptive workers
+CPU_BUSY_PERCENT = 95.0      # adaptive workers step down above this system CPU load
+CPU_IDLE_PERCENT = 80.0      # ...and may step up again below this
+DISK_QUEUE_BUSY = 4.0        # average outstanding disk requests that count as saturated
+DISK_QUEUE_IDLE = 2.0
+LARGE_FILE_BYTES = 64 * 1024 * 1024  # held back while available memory is low
+STAGING_COPY_WORKERS = 2     # parallel copies into, and separately out of, the staging workspace
+STAGING_CHUNK_BYTES = 8 * 1024 * 1024  # sequential read size when staging files
+JOURNAL_SYNC_INTERVAL = 1.0  # seconds between journal fsyncs
+JOURNAL_SYNC_RECORDS = 1000  # ...or sooner once this many records are waiting
+PARTIAL_OUTPUT_TAG = ".nconvert-part"  # outputs are written as name.nconvert-part.ext, then renamed
+OUTPUT_CHECK_BYTES = 64      # bytes read from each output to check its format signature
+WATCH_SETTLE_SECONDS = 3.0   # a watched file must be unchanged this long before it is converted
+WATCH_ROUND_INTERVAL = 10.0  # minimum seconds between watch mode conversion rounds
+JOB_POLL_INTERVAL = 1.0      # seconds the job runner sleeps when the queue is idle
+JOB_SAVE_INTERVAL = 5.0      # seconds between saves of a running job's progress
+DEFAULT_SCAN_EXCLUDE = ".git, Thumbs.db, $RECYCLE.BIN, System Volume Information"
 allowed_formats = ["JPEG", "PNG", "BMP", "GIF", "TIFF", "AVIF", "WEBP", "SVG", "PSD", "PSPIMAGE"]
+# Leading bytes a valid output starts with, as alternatives of (offset, bytes) parts;
+# formats missing here are only checked for being non-empty
+OUTPUT_SIGNATURES = {
+    "JPEG": [((0, b"\xff\xd8\xff"),)],
+    "JPG": [((0, b"\xff\xd8\xff"),)],
+    "PNG": [((0, b"\x89PNG\r\n\x1a\n"),)],
+    "BMP": [((0, b"BM"),)],
+    "GIF": [((0, b"GIF87a"),), ((0, b"GIF89a"),)],
+    "TIFF": [((0, b"II*\x00"),), ((0, b"MM\x00*"),)],
+    "TIF": [((0, b"II*\x00"),), ((0, b"MM\x00*"),)],
+    "AVIF": [((4, b"ftyp"),)],
+    "WEBP": [((0, b"RIFF"), (8, b"WEBP"))],
+    "SVG": [((0, b"<?xml"),), ((0, b"<svg"),)],
+    "PSD": [((0, b"8BPS"),)],
+    "PSPIMAGE": [((0, b"Paint Shop Pro Image File"),)],
+}
 
 # Session defaults
 _session = {
@@ -67,7 +155,26 @@ _session = {
     "last_from": "PSPIMAGE",
     "last_to": "JPEG",
     "last_delete": False,
-    "beep_on_complete": False
+    "beep_on_complete": False,
+    "max_workers": os.cpu_count() or 1,
+    "batch_size": 1,
+    "skip_up_to_date": False,
+    "manifest_hash": False,
+    "scan_include": "",
+    "scan_exclude": DEFAULT_SCAN_EXCLUDE,
+    "scan_max_depth": 0,
+    "follow_symlinks": False,
+    "timeout_floor": 5,
+    "timeout_ceiling": 600,
+    "dedup": False,
+    "dedup_link": "hardlink",
+    "adaptive_workers": False,
+    "min_workers": 1,
+    "low_memory_mb": 1024,
+    "schedule": "discovery",
+    "staging": False,
+    "staging_cap_mb": 4096,
+    "watch_poll_seconds": 10
 }
 
 # Load last session if exists
@@ -82,6 +189,30 @@ if SETTINGS_FILE.exists():
             _session["last_to"] = data.get("last_to", _session["last_to"])
             _session["last_delete"] = data.get("last_delete", _session["last_delete"])
             _session["beep_on_complete"] = data.get("beep_on_complete", _session["beep_on_complete"])
+            _session["skip_up_to_date"] = data.get("skip_up_to_date", _session["skip_up_to_date"])
+            _session["manifest_hash"] = data.get("manifest_hash", _session["manifest_hash"])
+            _session["scan_include"] = data.get("scan_include", _session["scan_include"])
+            _session["scan_exclude"] = data.get("scan_exclude", _session["scan_exclude"])
+            _session["follow_symlinks"] = data.get("follow_symlinks", _session["follow_symlinks"])
+            _session["dedup"] = data.get("dedup", _session["dedup"])
+            _session["adaptive_workers"] = data.get("adaptive_workers", _session["adaptive_workers"])
+            _session["staging"] = data.get("staging", _session["staging"])
+            if data.get("dedup_link") in DEDUP_LINK_MODES:
+                _session["dedup_link"] = data["dedup_link"]
+            if data.get("schedule") in SCHEDULE_POLICIES:
+                _session["schedule"] = data["schedule"]
+            try:
+                _session["max_workers"] = max(1, int(data.get("max_workers", _session["max_workers"])))
+                _session["batch_size"] = max(1, int(data.get("batch_size", _session["batch_size"])))
+                _session["scan_max_depth"] = max(0, int(data.get("scan_max_depth", _session["scan_max_depth"])))
+                _session["timeout_floor"] = max(1, int(data.get("timeout_floor", _session["timeout_floor"])))
+                _session["timeout_ceiling"] = max(1, int(data.get("timeout_ceiling", _session["timeout_ceiling"])))
+                _session["min_workers"] = max(1, int(data.get("min_workers", _session["min_workers"])))
+                _session["low_memory_mb"] = max(0, int(data.get("low_memory_mb", _session["low_memory_mb"])))
+                _session["staging_cap_mb"] = max(1, int(data.get("staging_cap_mb", _session["staging_cap_mb"])))
+                _session["watch_poll_seconds"] = max(1, int(data.get("watch_poll_seconds", _session["watch_poll_seconds"])))
+            except (TypeError, ValueError):
+                pass
         print("Loaded: .\\data\\persistent.json")
     except Exception:
         pass
@@ -91,11 +222,28 @@ format_from = _session["last_from"]
 format_to = _session["last_to"]
 delete_files_after = _session["last_delete"]
 beep_on_complete = _session["beep_on_complete"]
-
-# Processing tracking
-files_process_done = 0
-files_process_total = 0
-
+max_workers = _session["max_workers"]
+batch_size = _session["batch_size"]
+skip_up_to_date = _session["skip_up_to_date"]
+force_reconvert = False  # per-session override, deliberately not persisted
+manifest_hash = _session["manifest_hash"]
+scan_include = _session["scan_include"]
+scan_exclude = _session["scan_exclude"]
+scan_max_depth = _session["scan_max_depth"]
+follow_symlinks = _session["follow_symlinks"]
+timeout_floor = _session["timeout_floor"]
+timeout_ceiling = _session["timeout_ceiling"]
+dedup_enabled = _session["dedup"]
+dedup_link = _session["dedup_link"]
+adaptive_workers = _session["adaptive_workers"]
+min_workers = _session["min_workers"]
+low_memory_mb = _session["low_memory_mb"]
+schedule_policy = _session["schedule"]
+staging_enabled = _session["staging"]
+staging_cap_mb = _session["staging_cap_mb"]
+watch_poll_seconds = _session["watch_poll_seconds"]
+
+mark_startup("settings and session")
 print("..Initialization Complete.\n")
 
 # ─── Helpers ────────────────────────────────────────────────────────────────────
@@ -109,7 +257,26 @@ def save_last_session():
                 "last_from": format_from.upper(),
                 "last_to": format_to.upper(),
                 "last_delete": bool(delete_files_after),
-                "beep_on_complete": bool(beep_on_complete)
+                "beep_on_complete": bool(beep_on_complete),
+                "max_workers": int(max_workers),
+                "batch_size": int(batch_size),
+                "skip_up_to_date": bool(skip_up_to_date),
+                "manifest_hash": bool(manifest_hash),
+                "scan_include": scan_include,
+                "scan_exclude": scan_exclude,
+                "scan_max_depth": int(scan_max_depth),
+                "follow_symlinks": bool(follow_symlinks),
+                "timeout_floor": int(timeout_floor),
+                "timeout_ceiling": int(timeout_ceiling),
+                "dedup": bool(dedup_enabled),
+                "dedup_link": dedup_link,
+                "adaptive_workers": bool(adaptive_workers),
+                "min_workers": int(min_workers),
+                "low_memory_mb": int(low_memory_mb),
+                "schedule": schedule_policy,
+                "staging": bool(staging_enabled),
+                "staging_cap_mb": int(staging_cap_mb),
+                "watch_poll_seconds": int(watch_poll_seconds)
             }, indent=2),
             encoding="utf-8"
         )
@@ -126,6 +293,115 @@ def set_beep(value):
     global beep_on_complete
     beep_on_complete = bool(value)
 
+def set_max_workers(value):
+    global max_workers
+    try:
+        max_workers = max(1, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_adaptive_workers(value):
+    global adaptive_workers
+    adaptive_workers = bool(value)
+
+def set_min_workers(value):
+    global min_workers
+    try:
+        min_workers = max(1, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_low_memory_mb(value):
+    global low_memory_mb
+    try:
+        low_memory_mb = max(0, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_staging_enabled(value):
+    global staging_enabled
+    staging_enabled = bool(value)
+
+def set_staging_cap_mb(value):
+    global staging_cap_mb
+    try:
+        staging_cap_mb = max(1, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_watch_poll_seconds(value):
+    global watch_poll_seconds
+    try:
+        watch_poll_seconds = max(1, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_batch_size(value):
+    global batch_size
+    try:
+        batch_size = max(1, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_skip_up_to_date(value):
+    global skip_up_to_date
+    skip_up_to_date = bool(value)
+
+def set_force_reconvert(value):
+    global force_reconvert
+    force_reconvert = bool(value)
+
+def set_manifest_hash(value):
+    global manifest_hash
+    manifest_hash = bool(value)
+
+def set_scan_include(value):
+    global scan_include
+    scan_include = value or ""
+
+def set_scan_exclude(value):
+    global scan_exclude
+    scan_exclude = value or ""
+
+def set_scan_max_depth(value):
+    global scan_max_depth
+    try:
+        scan_max_depth = max(0, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_follow_symlinks(value):
+    global follow_symlinks
+    follow_symlinks = bool(value)
+
+def set_timeout_floor(value):
+    global timeout_floor
+    try:
+        timeout_floor = max(1, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_timeout_ceiling(value):
+    global timeout_ceiling
+    try:
+        timeout_ceiling = max(1, int(value))
+    except (TypeError, ValueError):
+        pass
+
+def set_dedup_enabled(value):
+    global dedup_enabled
+    dedup_enabled = bool(value)
+
+def set_dedup_link(value):
+    global dedup_link
+    if value in DEDUP_LINK_MODES:
+        dedup_link = value
+
+def set_schedule_policy(value):
+    global schedule_policy
+    if value in SCHEDULE_POLICIES:
+        schedule_policy = value
+
 def set_delete_files_after(value):
     global delete_files_after
     delete_files_after = bool(value)
@@ -137,19 +413,1022 @@ def set_format_from(new_format):
 
 def set_format_to(new_format):
     global format_to
-    if new_format:
-        format_to = new_format.upper()
+    if isinstance(new_format, (list, tuple)):
+        new_format = ", ".join(new_format)
+    # An empty selection is kept too; starting a run then reports it
+    format_to = ", ".join(parse_formats(new_format))
+
+def parse_formats(text):
+    """Split a comma separated list of formats into unique upper-case names, in order."""
+    formats = []
+    for name in str(text or "").split(","):
+        name = name.strip().upper()
+        if name and name not in formats:
+            formats.append(name)
+    return formats
+
+def parse_patterns(text):
+    """Split a comma/semicolon separated pattern list into lowercase globs."""
+    return [p.strip().lower() for p in text.replace(";", ",").split(",") if p.strip()]
+
+def matches_any(name, patterns):
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+def scan_tree(root, extensions, include=(), exclude=(), max_depth=0,
+              follow_links=False, workers=SCAN_WORKERS, with_mtime=False):
+    """
+    Lazily yield (path, size) for files under root with one of `extensions`,
+    or (path, size, mtime) with `with_mtime`. Directories are listed with
+    os.scandir on a thread pool; `exclude` globs apply to file and directory
+    names, `include` globs (if any) to file names, max_depth 0 means unlimited
+    and follow_links controls directory symlinks; with it, each real directory
+    is listed once.
+    """
+    extensions = tuple(e.lower() for e in extensions)
+    skip_dir = os.path.normcase(os.path.abspath(workspace_path))
+    seen_lock = Lock()
+    seen = set()
+
+    def first_visit(path):
+        real = os.path.normcase(os.path.realpath(path))
+        with seen_lock:
+            if real in seen:
+                return False
+            seen.add(real)
+            return True
+
+    def list_dir(path, depth):
+        found, subdirs = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if exclude and matches_any(entry.name, exclude):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=follow_links):
+                            if max_depth and depth >= max_depth:
+                                continue
+                            if os.path.normcase(entry.path) == skip_dir:
+                                continue
+                            # Every directory is recorded, so a link back to an ancestor is caught
+                            if follow_links and not first_visit(entry.path):
+                                continue
+                            subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(extensions) and entry.is_file():
+                            if include and not matches_any(entry.name, include):
+                                continue
+                            if PARTIAL_OUTPUT_TAG in entry.name:
+                                continue  # left behind by an interrupted conversion
+                            st = entry.stat()
+                            if with_mtime:
+                                found.append((entry.path, st.st_size, st.st_mtime))
+                            else:
+                                found.append((entry.path, st.st_size))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return found, subdirs, depth
+
+    if follow_links:
+        first_visit(root)
+    # Only a few listings are held at once; the rest wait as bare paths
+    backlog = deque([(root, 0)])
+    pending = set()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while backlog or pending:
+            while backlog and len(pending) < workers * 2:
+                path, depth = backlog.popleft()
+                pending.add(pool.submit(list_dir, path, depth))
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                found, subdirs, depth = future.result()
+                backlog.extend((subdir, depth + 1) for subdir in subdirs)
+                yield from found
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def listed_sources(files):
+    """(path, size) for an explicit list of files, skipping any that are gone."""
+    for path in files:
+        try:
+            yield path, os.path.getsize(path)
+        except OSError:
+            continue
+
+def scan_sources(options):
+    """
+    Lazy (path, size) iterator over the source files selected by options, or
+    over options["files"] when a caller such as watch mode already knows them.
+    """
+    if not os.path.isdir(options["folder"]):
+        return iter(())
+    if options.get("files") is not None:
+        return listed_sources(options["files"])
+    return scan_tree(
+        options["folder"],
+        [f".{options['format_from'].lower()}"],
+        include=parse_patterns(options["scan_include"]),
+        exclude=parse_patterns(options["scan_exclude"]),
+        max_depth=options["scan_max_depth"],
+        follow_links=options["follow_symlinks"]
+    )
+
+def find_files_to_convert(options=None):
+    """Lazy iterator over the source files selected by the current settings."""
+    return (path for path, _ in scan_sources(options or current_options()))
+
+def output_path(infile, dst_format):
+    return os.path.abspath(os.path.splitext(infile)[0] + f".{dst_format.lower()}")
+
+def partial_output_path(outfile):
+    """Temporary name nconvert writes an output to before it is checked and renamed."""
+    stem, ext = os.path.splitext(outfile)
+    return stem + PARTIAL_OUTPUT_TAG + ext
+
+def check_output(path, dst_format):
+    """Return None when path looks like a valid dst_format file, else the reason it does not."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(OUTPUT_CHECK_BYTES)
+    except OSError:
+        return "missing"
+    if not head:
+        return "empty"
+    signatures = OUTPUT_SIGNATURES.get(dst_format.upper())
+    if signatures is None:
+        return None
+    if dst_format.upper() == "SVG":
+        head = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    for parts in signatures:
+        if all(head[offset:offset + len(magic)] == magic for offset, magic in parts):
+            return None
+    return f"not a valid {dst_format.lower()} file"
+
+def sync_directory(path):
+    """Flush a directory's entries (a rename) to disk; Windows cannot open directories."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(path or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def replace_durably(partial, outfile):
+    """
+    Rename partial over outfile with its data and the rename both on disk, so
+    an original deleted afterwards cannot outlive its output on a power loss.
+    """
+    with open(partial, "rb+") as f:  # Windows only flushes handles open for writing
+        os.fsync(f.fileno())
+    os.replace(partial, outfile)
+    sync_directory(os.path.dirname(outfile))
+
+def finish_output(partial, outfile, dst_format):
+    """
+    Check a freshly written output and rename it over outfile, so the real
+    name only ever holds a complete file, synced to disk before the caller
+    may delete the original. Returns None on success, else the reason it was
+    rejected (the partial file is then removed).
+    """
+    problem = check_output(partial, dst_format)
+    if problem is None:
+        try:
+            replace_durably(partial, outfile)
+            return None
+        except OSError as e:
+            problem = f"rename failed: {e}"
+    remove_partial_output(partial)
+    return problem
+
+def is_output_current(infile, outfile):
+    """True when outfile exists, is non-empty and is not older than infile."""
+    try:
+        src = os.stat(infile)
+        out = os.stat(outfile)
+    except OSError:
+        return False
+    return out.st_size > 0 and out.st_mtime >= src.st_mtime
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# ─── Duplicate Detection ────────────────────────────────────────────────────────
+
+class DedupIndex:
+    """
+    Streaming duplicate detection. Files are grouped by size and only hashed
+    once a second file of the same size turns up; the first file seen with
+    given content is the representative that actually gets converted.
+    Representatives are keyed by absolute path, as results report them.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.unhashed = {}   # size -> first path seen with that size
+        self.by_hash = {}    # (size, hash) -> representative path
+        self.waiting = {}    # representative -> [(duplicate, targets)] until it finishes
+        self.finished = {}   # representative -> {"infile", "outputs": {target: outfile}}
+        self.ready = []      # (duplicate, targets, representative) entries to materialise
+
+    def representative_for(self, path, size):
+        """Return the representative path if `path` duplicates an earlier file."""
+        path = os.path.abspath(path)
+        if size not in self.unhashed:
+            self.unhashed[size] = path
+            return None
+        first = self.unhashed[size]
+        if first is not None:
+            self.unhashed[size] = None
+            try:
+                self.by_hash.setdefault((size, file_hash(first)), first)
+            except OSError:
+                pass  # already converted and deleted, nothing left to share
+        key = (size, file_hash(path))
+        representative = self.by_hash.get(key)
+        if representative is None:
+            self.by_hash[key] = path
+        return representative
+
+    def add_duplicate(self, duplicate, targets, representative):
+        representative = os.path.abspath(representative)
+        with self.lock:
+            if representative in self.finished:
+                self.ready.append((duplicate, targets, self.finished[representative]))
+            else:
+                self.waiting.setdefault(representative, []).append((duplicate, targets))
+
+    def representative_finished(self, infile, results):
+        """Record a representative's results, one per target format it was converted to."""
+        infile = os.path.abspath(infile)
+        with self.lock:
+            finished = {
+                "infile": infile,
+                "outputs": {result["target"]: result["outfile"] for result in results if result["ok"]}
+            }
+            self.finished[infile] = finished
+            for duplicate, targets in self.waiting.pop(infile, []):
+                self.ready.append((duplicate, targets, finished))
+
+    def take_ready(self):
+        with self.lock:
+            ready, self.ready = self.ready, []
+        return ready
+
+def link_or_copy(source, destination, mode):
+    """Place a copy of source at destination, hardlinking when asked and possible."""
+    if os.path.abspath(source) == os.path.abspath(destination):
+        return "same file"
+    temp = destination + ".dedup-tmp"
+    if os.path.exists(temp):
+        os.remove(temp)
+    method = "copied"
+    if mode == "hardlink":
+        try:
+            os.link(source, temp)
+            method = "hardlinked"
+        except OSError:
+            pass
+    if method == "copied":
+        shutil.copy2(source, temp)
+    replace_durably(temp, destination)
+    return method
+
+def materialize_duplicate(duplicate, dst_format, representative, options):
+    """Give a duplicate source the representative's output instead of converting it."""
+    outfile = output_path(duplicate, dst_format)
+    started = time.time()
+    name = os.path.basename(duplicate)
+    try:
+        method = link_or_copy(representative["outputs"][dst_format], outfile, options["dedup_link"])
+        result = conversion_result(
+            os.path.abspath(duplicate), outfile, "ok",
+            f"{name} - duplicate of {os.path.relpath(representative['infile'], options['folder'])} ({method})",
+            time.time() - started, 0
+        )
+    except OSError as e:
+        result = conversion_result(
+            os.path.abspath(duplicate), outfile, "error",
+            f"{name} - ERROR: could not reuse duplicate output: {e}", time.time() - started, None, str(e)
+        )
+    result["duplicate"] = True
+    result["target"] = dst_format
+    try:
+        st = os.stat(duplicate)
+        result["size"], result["mtime"] = st.st_size, st.st_mtime
+    except OSError:
+        result["size"], result["mtime"] = 0, 0.0
+    result["output_size"] = os.path.getsize(outfile) if result["ok"] else 0
+    return result
+
+def process_duplicate(duplicate, targets, representative, options):
+    """
+    Worker entry point for a duplicate; targets the representative failed to
+    produce are converted normally.
+    """
+    if options["cancel"].is_set():
+        return process_batch([duplicate], options, targets)
+    results = [
+        materialize_duplicate(duplicate, target, representative, options)
+        for target in targets if target in representative["outputs"]
+    ]
+    missing = [target for target in targets if target not in representative["outputs"]]
+    if missing:
+        results.extend(process_batch([duplicate], options, missing))
+    return results
+
+# ─── Adaptive Timeouts ──────────────────────────────────────────────────────────
+
+class ThroughputTracker:
+    """Running average of bytes/sec per (from, to) format pair, shared by all runs."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.rates = {}
+
+    def observe(self, pair, size, seconds):
+        if size <= 0 or seconds <= 0:
+            return
+        rate = size / seconds
+        with self.lock:
+            previous = self.rates.get(pair)
+            self.rates[pair] = rate if previous is None else (
+                previous + THROUGHPUT_SMOOTHING * (rate - previous)
+            )
+
+    def rate(self, pair):
+        with self.lock:
+            return self.rates.get(pair, DEFAULT_THROUGHPUT)
+
+throughput_tracker = ThroughputTracker()
+
+def conversion_timeout(size, pair, options, files=1):
+    """
+    Seconds to allow for converting `size` bytes in one nconvert call, from
+    the observed throughput of the format pair. The floor applies per call
+    and the ceiling per file.
+    """
+    expected = size / throughput_tracker.rate(pair)
+    limit = TIMEOUT_STARTUP + TIMEOUT_SAFETY_FACTOR * expected
+    return min(max(limit, options["timeout_floor"]), options["timeout_ceiling"] * files)
+
+def retry_timeout(limit):
+    """
+    Limit for the single retry after a timeout. It may pass the ceiling, up to
+    TIMEOUT_RETRY_FACTOR times it, so a file already at the ceiling still gets
+    a longer second try.
+    """
+    return limit * TIMEOUT_RETRY_FACTOR
+
+# ─── Resource Throttling ────────────────────────────────────────────────────────
+
+class ResourceGovernor:
+    """
+    Adaptive worker limit for one run. Each sample steps the number of
+    concurrent conversions down when available memory, the disk queue or
+    system CPU is past its limit, and back up when all have room, always
+    within [min_workers, workers]. Starts at the minimum and ramps up.
+    """
+
+    def __init__(self, options):
+        import psutil
+        self.psutil = psutil
+        self.maximum = options["workers"]
+        self.minimum = max(1, min(options["min_workers"], self.maximum))
+        self.low_memory = options["low_memory_mb"] * 1024 * 1024
+        self.limit = self.minimum
+        self.memory_low = False
+        self.cpu = self.queue_depth = 0.0
+        self.available = None
+        psutil.cpu_percent(None)  # first call only primes the counter
+        self.last_sample = time.time()
+        self.last_disk = self._disk_busy_ms()
+
+    def _disk_busy_ms(self):
+        try:
+            counters = self.psutil.disk_io_counters()
+        except Exception:
+            return None
+        return None if counters is None else counters.read_time + counters.write_time
+
+    def update(self):
+        """Sample system load if it is time to, and return the current limit."""
+        now = time.time()
+        if now - self.last_sample < RESOURCE_SAMPLE_INTERVAL:
+            return self.limit
+        elapsed_ms = (now - self.last_sample) * 1000.0
+        self.last_sample = now
+        self.cpu = self.psutil.cpu_percent(None)
+        self.available = self.psutil.virtual_memory().available
+        # Time spent on requests per elapsed time is the mean number outstanding
+        disk = self._disk_busy_ms()
+        if disk is not None and self.last_disk is not None:
+            self.queue_depth = max(0.0, disk - self.last_disk) / elapsed_ms
+        self.last_disk = disk
+        self.memory_low = self.available < self.low_memory
+        if self.memory_low or self.queue_depth > DISK_QUEUE_BUSY or self.cpu > CPU_BUSY_PERCENT:
+            self.limit = max(self.minimum, self.limit - 1)
+        elif self.cpu < CPU_IDLE_PERCENT and self.queue_depth < DISK_QUEUE_IDLE:
+            self.limit = min(self.maximum, self.limit + 1)
+        return self.limit
+
+# ─── Conversion Manifest ────────────────────────────────────────────────────────
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversions (
+    source_path   TEXT NOT NULL,
+    target_format TEXT NOT NULL,
+    size          INTEGER NOT NULL,
+    mtime         REAL NOT NULL,
+    content_hash  TEXT,
+    output_path   TEXT NOT NULL,
+    duration      REAL,
+    result        TEXT NOT NULL,
+    run_id        INTEGER,
+    converted_at  REAL NOT NULL,
+    PRIMARY KEY (source_path, target_format)
+);
+CREATE INDEX IF NOT EXISTS idx_conversions_run ON conversions(run_id);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    started     REAL NOT NULL,
+    finished    REAL,
+    folder      TEXT,
+    format_from TEXT,
+    format_to   TEXT,
+    total       INTEGER DEFAULT 0,
+    converted   INTEGER DEFAULT 0,
+    failed      INTEGER DEFAULT 0,
+    skipped     INTEGER DEFAULT 0
+);
+"""
+
+class ConversionManifest:
+    """SQLite record of every conversion, keyed by (source path, target format)."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else DATA_DIR / MANIFEST_FILE.name
+        self.path.parent.mkdir(exist_ok=True)
+        self.lock = Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(MANIFEST_SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def is_current(self, source, target_format, use_hash=False):
+        """True when the last successful conversion of source still applies."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, mtime, content_hash, output_path, result FROM conversions "
+                "WHERE source_path = ? AND target_format = ?",
+                (source, target_format.upper())
+            ).fetchone()
+        if not row or row[4] != "ok" or not os.path.exists(row[3]):
+            return False
+        try:
+            st = os.stat(source)
+        except OSError:
+            return False
+        if st.st_size != row[0]:
+            return False
+        if st.st_mtime == row[1]:
+            return True
+        # Copied files keep their bytes but not their mtime
+        if not (use_hash and row[2]):
+            return False
+        try:
+            return file_hash(source) == row[2]
+        except OSError:
+            return False  # locked or gone since the stat; let the conversion report it
+
+    def record(self, rows):
+        """Bulk insert (source, target, size, mtime, hash, output, duration, result, run_id) rows."""
+        if not rows:
+            return
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO conversions (source_path, target_format, size, mtime, "
+                "content_hash, output_path, duration, result, run_id, converted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (now,) for row in rows]
+            )
+
+    def start_run(self, folder, src_format, dst_format):
+        with self.lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (started, folder, format_from, format_to) VALUES (?, ?, ?, ?)",
+                (time.time(), folder, src_format.upper(), dst_format.upper())
+            )
+            return cur.lastrowid
+
+    def finish_run(self, run_id, total, converted, failed, skipped):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished = ?, total = ?, converted = ?, failed = ?, skipped = ? "
+                "WHERE run_id = ?",
+                (time.time(), total, converted, failed, skipped, run_id)
+            )
 
-def find_files_to_convert():
-    if not os.path.exists(folder_location):
+    def recent_runs(self, limit=20):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT run_id, started, finished, folder, format_from, format_to, "
+                "total, converted, failed, skipped FROM runs ORDER BY run_id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+    def compact(self, keep_runs=MANIFEST_KEEP_RUNS):
+        """Drop rows whose source and output are both gone, and old run history."""
+        with self.lock:
+            stale = [
+                (source, target)
+                for source, target, output in self.conn.execute(
+                    "SELECT source_path, target_format, output_path FROM conversions"
+                )
+                if not os.path.exists(source) and not os.path.exists(output)
+            ]
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM conversions WHERE source_path = ? AND target_format = ?", stale
+                )
+                self.conn.execute(
+                    "DELETE FROM runs WHERE run_id NOT IN "
+                    "(SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?)",
+                    (keep_runs,)
+                )
+            self.conn.execute("VACUUM")
+        return len(stale)
+
+def open_manifest():
+    try:
+        return ConversionManifest()
+    except Exception as e:
+        print(f"Manifest unavailable: {e}")
+        return None
+
+def manifest_history(limit=20):
+    manifest = open_manifest()
+    if manifest is None:
+        return []
+    try:
+        rows = manifest.recent_runs(limit)
+    finally:
+        manifest.close()
+    history = []
+    for run_id, started, finished, folder, src, dst, total, converted, failed, skipped in rows:
+        history.append([
+            run_id,
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(started)),
+            format_duration(finished - started) if finished else "unfinished",
+            folder,
+            f"{src} → {dst}",
+            total, converted, failed, skipped
+        ])
+    return history
+
+def compact_manifest():
+    manifest = open_manifest()
+    if manifest is None:
+        return "Manifest unavailable."
+    try:
+        removed = manifest.compact()
+    finally:
+        manifest.close()
+    return f"Manifest compacted: removed {removed} stale row(s)."
+
+# ─── Run Report ─────────────────────────────────────────────────────────────────
+
+def run_stamp():
+    """Local time to the millisecond, sortable, for naming a run's report, log and journal."""
+    now = time.time()
+    return time.strftime("%Y%m%d_%H%M%S", time.localtime(now)) + f"_{int(now * 1000) % 1000:03d}"
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class RunReport:
+    """
+    Per-file timings for one run. Rows stream to a CSV as they arrive; only
+    latencies, the slowest files and per-directory totals stay in memory.
+    Only the newest REPORT_KEEP_FILES reports are kept.
+    """
+
+    CSV_FIELDS = ["source", "target", "status", "input_bytes", "output_bytes",
+                  "seconds", "exit_code", "stderr"]
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else DATA_DIR / REPORTS_DIR.name
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = run_stamp()
+        self.csv_path = self.directory / f"report_{stamp}.csv"
+        self.json_path = self.directory / f"report_{stamp}.json"
+        self.csv_file = self.csv_path.open("w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.csv_file)
+        self.writer.writerow(self.CSV_FIELDS)
+        reports = sorted(self.directory.glob("report_*.csv"), reverse=True)
+        for old in reports[REPORT_KEEP_FILES:]:
+            for path in (old, old.with_suffix(".json")):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        self.started = time.time()
+        self.latencies = []
+        self.slowest = []  # min-heap of (seconds, source)
+        self.directories = {}
+        self.files = self.failed = self.input_bytes = self.output_bytes = 0
+
+    def add(self, result, target_format):
+        seconds = result["duration"]
+        self.files += 1
+        self.failed += not result["ok"]
+        self.input_bytes += result.get("size", 0)
+        self.output_bytes += result.get("output_size", 0)
+        self.latencies.append(seconds)
+        entry = (seconds, result["infile"])
+        if len(self.slowest) < REPORT_SLOWEST:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+        totals = self.directories.setdefault(
+            os.path.dirname(result["infile"]),
+            {"files": 0, "failed": 0, "seconds": 0.0, "input_bytes": 0, "output_bytes": 0}
+        )
+        totals["files"] += 1
+        totals["failed"] += not result["ok"]
+        totals["seconds"] += seconds
+        totals["input_bytes"] += result.get("size", 0)
+        totals["output_bytes"] += result.get("output_size", 0)
+        self.writer.writerow([
+            result["infile"], target_format.upper(), result["status"],
+            result.get("size", 0), result.get("output_size", 0), f"{seconds:.4f}",
+            "" if result.get("returncode") is None else result["returncode"],
+            result.get("stderr", "").replace("\n", " ")
+        ])
+
+    def summary(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {
+            "files": self.files,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_sec": round(self.files / elapsed, 2),
+            "input_mb_per_sec": round(self.input_bytes / elapsed / (1024 * 1024), 2),
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "latency_seconds": {
+                name: round(percentile(self.latencies, pct), 4) if self.latencies else None
+                for name, pct in (("p50", 50), ("p90", 90), ("p95", 95), ("p99", 99), ("max", 100))
+            },
+            "slowest": [
+                {"source": source, "seconds": round(seconds, 4)}
+                for seconds, source in sorted(self.slowest, reverse=True)
+            ],
+            "directories": [
+                dict(directory=directory, **{k: round(v, 4) if isinstance(v, float) else v
+                                             for k, v in totals.items()})
+                for directory, totals in sorted(
+                    self.directories.items(), key=lambda item: item[1]["seconds"], reverse=True
+                )
+            ],
+            "csv": str(self.csv_path),
+            "json": str(self.json_path)
+        }
+
+    def discard(self):
+        self.csv_file.close()
+        self.csv_path.unlink(missing_ok=True)
+
+    def finish(self, extra=None):
+        self.csv_file.close()
+        summary = self.summary()
+        if extra:
+            summary.update(extra)
+        self.json_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        return summary
+
+def open_report():
+    try:
+        return RunReport()
+    except Exception as e:
+        print(f"Run report unavailable: {e}")
+        return None
+
+def format_report(summary, top_dirs=10):
+    if not summary or not summary.get("files"):
+        return ""
+    lat = summary["latency_seconds"]
+    out = [
+        f"Throughput:   {summary['files_per_sec']} files/s, {summary['input_mb_per_sec']} MB/s read",
+        f"Data:         {summary['input_bytes'] / (1024 * 1024):.1f} MB in → "
+        f"{summary['output_bytes'] / (1024 * 1024):.1f} MB out",
+        f"Latency:      p50 {lat['p50']:.3f}s  p90 {lat['p90']:.3f}s  p95 {lat['p95']:.3f}s  "
+        f"p99 {lat['p99']:.3f}s  max {lat['max']:.3f}s",
+    ]
+    if summary.get("makespan_seconds"):
+        makespan, ideal = summary["makespan_seconds"], summary["makespan_lower_bound_seconds"]
+        out.append(
+            f"Makespan:     {makespan:.2f}s with {summary.get('schedule', 'discovery')} order, "
+            f"ideal ≥ {ideal:.2f}s ({min(1.0, ideal / makespan):.0%} efficient)"
+        )
+    out += [
+        "",
+        f"Slowest {len(summary['slowest'])} file(s):"
+    ]
+    out += [f"  {item['seconds']:8.3f}s  {item['source']}" for item in summary["slowest"]]
+    out += ["", f"Top directories by time (of {len(summary['directories'])}):"]
+    out += [
+        f"  {item['seconds']:8.2f}s  {item['files']:6d} files  {item['failed']:4d} failed  {item['directory']}"
+        for item in summary["directories"][:top_dirs]
+    ]
+    out += ["", f"Full report: {summary['json']}", f"Per-file CSV: {summary['csv']}"]
+    return "\n".join(out)
+
+# ─── Run Log ────────────────────────────────────────────────────────────────────
+
+# Message markers written by convert_file/convert_batch for files that did not convert
+FAILURE_MARKERS = (" - FAILED", " - TIMEOUT", " - ERROR", "Failed to delete")
+
+class RunLog:
+    """
+    Every log line of one run, appended to data/logs/run_<stamp>.log as the
+    engine yields it, so memory never holds more than the UI's recent tail.
+    Only the newest LOG_KEEP_FILES run logs are kept.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else DATA_DIR / LOGS_DIR.name
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"run_{run_stamp()}.log"
+        self.file = self.path.open("a", encoding="utf-8")
+        for old in list_run_logs(self.directory)[LOG_KEEP_FILES:]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    def write(self, lines):
+        if lines:
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def open_run_log():
+    try:
+        return RunLog()
+    except Exception as e:
+        print(f"Run log unavailable: {e}")
+        return None
+
+def list_run_logs(directory=None):
+    """Run log files, newest first."""
+    directory = Path(directory) if directory else DATA_DIR / LOGS_DIR.name
+    try:
+        return sorted(directory.glob("run_*.log"), reverse=True)
+    except OSError:
         return []
-    files = []
-    ext = f".{format_from.lower()}"
-    for root, _, filenames in os.walk(folder_location):
-        for fn in filenames:
-            if fn.lower().endswith(ext):
-                files.append(os.path.join(root, fn))
-    return files
+
+def read_log_page(path, query="", failures_only=False, page=1):
+    """
+    One page of a run log after filtering, streamed from disk so only the
+    page is held in memory. Returns (text, page, pages, matching_lines).
+    """
+    query = (query or "").strip().lower()
+    page = max(1, int(page or 1))
+    first = (page - 1) * LOG_PAGE_LINES
+    selected, matches = [], 0
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if failures_only and not any(marker in line for marker in FAILURE_MARKERS):
+                    continue
+                if query and query not in line.lower():
+                    continue
+                if first <= matches < first + LOG_PAGE_LINES:
+                    selected.append(line)
+                matches += 1
+    except (OSError, TypeError) as e:
+        return f"Log unavailable: {e}", 1, 1, 0
+    pages = max(1, -(-matches // LOG_PAGE_LINES))
+    if page > pages:
+        return read_log_page(path, query, failures_only, pages)
+    return "\n".join(selected), page, pages, matches
+
+# ─── Run Journal ────────────────────────────────────────────────────────────────
+
+# Option keys that only make sense inside one process
+JOURNAL_SKIP_OPTIONS = ("cancel", "pause", "journal", "resume_from", "resume_done", "run_log")
+
+_active_journals = set()
+
+class RunJournal:
+    """
+    Write-ahead journal of one run in data/journal/run_<stamp>.jsonl: the
+    options, then each file's state as it moves through queued, converting,
+    done/failed and deleted. Records are written straight away and fsynced
+    in batches. A run that ends normally removes its journal, so any journal
+    left behind belongs to a run that was interrupted and can be resumed.
+    """
+
+    def __init__(self, options, path=None):
+        self.lock = Lock()
+        self.pending = 0
+        self.last_sync = time.time()
+        if path is None:
+            directory = DATA_DIR / JOURNAL_DIR.name
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"run_{run_stamp()}.jsonl"
+        self.path = Path(path)
+        resuming = self.path.exists()
+        self.file = self.path.open("a", encoding="utf-8")
+        with _active_tokens_lock:
+            _active_journals.add(self.path)
+        options = {key: value for key, value in options.items() if key not in JOURNAL_SKIP_OPTIONS}
+        self.record("resumed" if resuming else "started", options=options, time=time.time(),
+                    pid=os.getpid())
+        self.sync()
+
+    def record(self, event, files=None, target=None, **fields):
+        entry = {"event": event}
+        if files is not None:
+            entry["files"] = files
+        if target is not None:
+            entry["target"] = target
+        entry.update(fields)
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(json.dumps(entry) + "\n")
+            self.pending += 1
+        if self.pending >= JOURNAL_SYNC_RECORDS or time.time() - self.last_sync >= JOURNAL_SYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+            self.last_sync = time.time()
+
+    def close(self):
+        """Close but keep the journal, leaving the run resumable."""
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+        with _active_tokens_lock:
+            _active_journals.discard(self.path)
+
+    def finish(self):
+        """The run ended normally; nothing is left to resume."""
+        self.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+def open_journal(options):
+    try:
+        return RunJournal(options, options.get("resume_from"))
+    except Exception as e:
+        print(f"Run journal unavailable: {e}")
+        return None
+
+def read_journal(path):
+    """
+    Replay a journal into (options, done, counts): the run's options, the
+    targets already converted per source, and per-state file counts plus
+    "owner", the pid of the process that last started or resumed it.
+    """
+    options, done, converting, queued, failed, deleted = None, {}, set(), set(), set(), set()
+    owner = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # a torn last line from the crash
+            event = entry.get("event")
+            files = entry.get("files") or []
+            if event in ("started", "resumed"):
+                owner = entry.get("pid")
+                if options is None:
+                    options = entry.get("options")
+            elif event == "queued":
+                queued.update(files)
+            elif event == "converting":
+                converting.update(files)
+            elif event == "done":
+                for infile in files:
+                    done.setdefault(infile, set()).add(entry.get("target"))
+            elif event == "failed":
+                failed.update(files)
+            elif event == "deleted":
+                deleted.update(files)
+    counts = {
+        "queued": len(queued | converting),
+        "done": len(done),
+        "failed": len(failed - set(done)),
+        "deleted": len(deleted),
+        "interrupted": len(converting - set(done) - failed),
+        "owner": owner
+    }
+    return options, done, counts
+
+def process_alive(pid):
+    """Whether process `pid` is running; True when that cannot be told, so its files are left alone."""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except Exception:
+        return True
+
+def unfinished_runs(include_jobs=False):
+    """
+    Journals left by interrupted runs, newest first, as (path, options, counts)
+    tuples. Journals of runs still going, here or in another instance (GUI and
+    --cli), are left out.
+    """
+    directory = DATA_DIR / JOURNAL_DIR.name
+    with _active_tokens_lock:
+        active = set(_active_journals)
+    runs = []
+    try:
+        paths = sorted(directory.glob("run_*.jsonl"), reverse=True)
+    except OSError:
+        return runs
+    for path in paths:
+        if path in active:
+            continue
+        try:
+            options, _, counts = read_journal(path)
+        except OSError:
+            continue
+        if not options or (options.get("job") and not include_jobs):
+            continue
+        owner = counts["owner"]
+        if isinstance(owner, int) and owner != os.getpid() and process_alive(owner):
+            continue
+        runs.append((path, options, counts))
+    return runs
+
+def describe_unfinished_run(run):
+    path, options, counts = run
+    try:
+        started = time.strftime("%Y-%m-%d %H:%M", time.strptime(path.stem[4:19], "%Y%m%d_%H%M%S"))
+    except ValueError:
+        started = path.stem
+    return (
+        f"Unfinished run from {started}: {options['format_from']} → "
+        f"{options['format_to']} in {options['folder']}, {counts['done']} of "
+        f"{counts['queued']} file(s) done before it stopped."
+    )
+
+def resume_options(path):
+    """Options to resume the run journaled at `path`, skipping work it finished."""
+    options, done, _ = read_journal(path)
+    options = {**current_options(), **options}
+    options["resume_from"] = str(path)
+    options["resume_done"] = done
+    return options
+
+def discard_unfinished_runs():
+    removed = 0
+    for path, _, _ in unfinished_runs():
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return f"Discarded {removed} unfinished run journal(s)."
 
 # ─── ROBUST EXIT HANDLING ───────────────────────────────────────────────────────
 
@@ -158,6 +1437,7 @@ def terminate_process_tree(pid=None):
     if pid is None:
         pid = os.getpid()
     try:
+        import psutil
         parent = psutil.Process(pid)
         children = parent.children(recursive=True)
         for child in children:
@@ -203,9 +1483,11 @@ def graceful_shutdown():
         print("✓ Session saved")
     except Exception as e:
         print(f"! Session save warning: {e}")
+    remove_pidfile()
     
     # Step 2: Signal shutdown to prevent new operations
     print("✓ Shutdown flag set")
+    cancel_conversion(jobs=True)
     
     # Step 3: Close Gradio interface (async-safe method)
     if global_demo is not None:
@@ -273,109 +1555,1685 @@ atexit.register(save_last_session)
 
 # ─── Main Conversion ────────────────────────────────────────────────────────────
 
-def start_conversion():
-    global files_process_done, files_process_total
+class ConversionCancelled(Exception):
+    pass
+
+class CancelToken:
+    """Per-run cancellation flag that also kills the nconvert children it tracks."""
+
+    def __init__(self, background=False):
+        self.background = background  # owned by the job queue, not the Cancel button
+        self.event = Event()
+        self.lock = Lock()
+        self.processes = set()
+
+    def is_set(self):
+        return self.event.is_set()
+
+    def register(self, proc):
+        with self.lock:
+            self.processes.add(proc)
+            cancelled = self.event.is_set()
+        if cancelled:
+            self._kill(proc)
+
+    def unregister(self, proc):
+        with self.lock:
+            self.processes.discard(proc)
+
+    def cancel(self):
+        self.event.set()
+        with self.lock:
+            running = list(self.processes)
+        for proc in running:
+            self._kill(proc)
+
+    @staticmethod
+    def _kill(proc):
+        try:
+            proc.kill()
+        except OSError:
+            pass
 
-    if _shutdown_requested:
-        return "Error: Shutdown in progress."
+_active_tokens = set()
+_active_tokens_lock = Lock()
 
-    if not os.path.exists(folder_location):
-        return "Error: Invalid folder location."
+def cancel_conversion(jobs=False):
+    """
+    Cancel the running conversions started from the UI, and queued jobs too
+    when `jobs` is set; the engines wind down on their own.
+    """
+    with _active_tokens_lock:
+        tokens = [token for token in _active_tokens if jobs or not token.background]
+    for token in tokens:
+        token.cancel()
+    return "Cancelling..." if tokens else "No conversion is running."
+
+def remove_partial_output(partial):
+    """Delete the temporary output of a conversion that did not finish."""
+    try:
+        os.remove(partial)
+    except OSError:
+        pass
 
-    files = find_files_to_convert()
-    if not files:
-        return f"No .{format_from.lower()} files found in selected folder."
+def run_nconvert(cmd, timeout, cancel=None):
+    """
+    Run one nconvert command line. Raises subprocess.TimeoutExpired when the
+    limit passes and ConversionCancelled when `cancel` fires; the child is
+    killed in both cases.
+    """
+    if cancel is not None and cancel.is_set():
+        raise ConversionCancelled()
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        shell=False,
+        cwd=os.path.dirname(nconvert_path)
+    )
+    if cancel is not None:
+        cancel.register(proc)
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        raise
+    finally:
+        if cancel is not None:
+            cancel.unregister(proc)
+    if cancel is not None and cancel.is_set():
+        raise ConversionCancelled()
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+def convert_file(infile, dst_format, options):
+    """Run nconvert on a single file; safe to call from worker threads."""
+    src_format = options["format_from"]
+    infile_abs = os.path.abspath(infile)
+    outfile_abs = output_path(infile, dst_format)
+    partial = partial_output_path(outfile_abs)
+
+    cmd = [
+        nconvert_path,
+        "-out", dst_format.lower(),
+        "-overwrite",
+        "-o", partial,
+        infile_abs
+    ]
+
+    filename_display = os.path.basename(infile)
+    pair = (src_format.upper(), dst_format.upper())
+    try:
+        size = os.path.getsize(infile_abs)
+    except OSError:
+        size = 0
+    limit = conversion_timeout(size, pair, options)
+    cancel = options.get("cancel")
+    started = time.time()
+    retried = False
+    try:
+        try:
+            result = run_nconvert(cmd, limit, cancel)
+        except subprocess.TimeoutExpired:
+            # One more go with a longer limit before giving up on the file
+            retried = True
+            result = run_nconvert(cmd, retry_timeout(limit), cancel)
+        returncode = result.returncode
+        stderr = result.stderr.strip()
+        problem = finish_output(partial, outfile_abs, dst_format) if returncode == 0 else None
+        if returncode == 0 and problem is None:
+            status = "ok"
+            message = f"{filename_display} - {src_format.lower()} → {dst_format.lower()}"
+            if retried:
+                message += " (retried after timeout)"
+            throughput_tracker.observe(pair, size, time.time() - started)
+        elif problem is not None:
+            status = "failed"
+            message = f"{filename_display} - FAILED (output {problem})"
+        else:
+            status = "failed"
+            message = f"{filename_display} - FAILED ({stderr or 'Unknown error'})"
+    except subprocess.TimeoutExpired as e:
+        returncode, stderr = None, ""
+        status = "timeout"
+        message = f"{filename_display} - TIMEOUT (after {e.timeout:.0f}s)"
+    except ConversionCancelled:
+        returncode, stderr = None, ""
+        status = "cancelled"
+        message = f"{filename_display} - CANCELLED"
+    except Exception as e:
+        returncode, stderr = None, str(e)
+        status = "error"
+        message = f"{filename_display} - ERROR: {str(e)}"
+    if status != "ok":
+        remove_partial_output(partial)
+    return conversion_result(
+        infile_abs, outfile_abs, status, message, time.time() - started, returncode, stderr
+    )
 
-    files_process_done = 0
-    files_process_total = len(files)
-    newly_converted = []
-    log = [f"Processing {files_process_total} file(s)...\n"]
+def conversion_result(infile, outfile, status, message, duration, returncode=None, stderr=""):
+    return {
+        "infile": infile,
+        "outfile": outfile,
+        "ok": status == "ok",
+        "status": status,
+        "message": message,
+        "duration": duration,
+        "returncode": returncode,
+        "stderr": stderr[:STDERR_EXCERPT_CHARS]
+    }
 
-    for infile in files:
-        if _shutdown_requested:
-            log.append("\n! Shutdown requested, stopping...")
-            break
-            
-        outfile = os.path.splitext(infile)[0] + f".{format_to.lower()}"
-        infile_abs = os.path.abspath(infile)
-        outfile_abs = os.path.abspath(outfile)
-        working_dir = os.path.dirname(nconvert_path)
-
-        cmd = [
-            nconvert_path,
-            "-out", format_to.lower(),
-            "-overwrite",
-            "-o", outfile_abs,
-            infile_abs
-        ]
+def iter_batches(entries, size):
+    """
+    Group a stream of (file, bytes, targets) entries into same-directory
+    chunks of at most `size` files that need the same target formats,
+    yielded as (files, targets, sizes). The scanner yields each directory's
+    files together, so a chunk is emitted as soon as the next directory starts.
+    """
+    batch, sizes, batch_dir, batch_targets, chars = [], [], None, None, 0
+    for infile, file_size, targets in entries:
+        directory = os.path.dirname(os.path.abspath(infile))
+        length = len(infile) + 3
+        if batch and (directory != batch_dir or targets != batch_targets or len(batch) >= size
+                      or chars + length > MAX_COMMAND_CHARS):
+            yield batch, batch_targets, sizes
+            batch, sizes, chars = [], [], 0
+        batch_dir, batch_targets = directory, targets
+        batch.append(infile)
+        sizes.append(file_size)
+        chars += length
+    if batch:
+        yield batch, batch_targets, sizes
+
+class BatchSchedule:
+    """
+    Batches found by the scanner that are waiting for a worker, handed out by
+    policy: "discovery" keeps scan order, "largest" runs the biggest batches
+    first (longest processing time first, so one huge file found late does
+    not keep the run going after everything else is done) and "locality"
+    takes folders in path order so a spinning disk reads neighbouring data.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy if policy in SCHEDULE_POLICIES else "discovery"
+        self.heap = []
+        self.count = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, item):
+        batch, _, sizes = item
+        if self.policy == "largest":
+            key = -sum(sizes)
+        elif self.policy == "locality":
+            key = os.path.normcase(os.path.dirname(os.path.abspath(batch[0])))
+        else:
+            key = 0
+        # The counter keeps scan order among equal keys and never compares items
+        heapq.heappush(self.heap, (key, self.count, item))
+        self.count += 1
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+def convert_batch(batch, dst_format, options):
+    """
+    Convert several files of one directory in a single nconvert call.
+    Per-file success is read back from the output files and stderr; anything
+    not confirmed is retried one file at a time via convert_file.
+    """
+    if len(batch) == 1:
+        return [convert_file(batch[0], dst_format, options)]
+
+    src_format = options["format_from"]
+    pair = (src_format.upper(), dst_format.upper())
+    ext = dst_format.lower()
+    out_dir = os.path.dirname(os.path.abspath(batch[0]))
+    cmd = [
+        nconvert_path,
+        "-out", ext,
+        "-overwrite",
+        "-o", os.path.join(out_dir, f"%{PARTIAL_OUTPUT_TAG}.{ext}")
+    ] + [os.path.abspath(infile) for infile in batch]
+
+    sizes = []
+    for infile in batch:
+        try:
+            sizes.append(os.path.getsize(infile))
+        except OSError:
+            sizes.append(0)
+    limit = conversion_timeout(sum(sizes), pair, options, files=len(batch))
+
+    batch_start = time.time()
+    try:
+        result = run_nconvert(cmd, limit, options.get("cancel"))
+        stderr = result.stderr or ""
+    except ConversionCancelled:
+        results = []
+        for infile in batch:
+            outfile_abs = output_path(infile, dst_format)
+            remove_partial_output(partial_output_path(outfile_abs))
+            results.append(conversion_result(
+                os.path.abspath(infile), outfile_abs, "cancelled",
+                f"{os.path.basename(infile)} - CANCELLED", time.time() - batch_start
+            ))
+        return results
+    except Exception:
+        # Whole call failed (timeout, launch error) - retry everything singly
+        return [convert_file(infile, dst_format, options) for infile in batch]
+
+    elapsed = time.time() - batch_start
+    per_file = elapsed / len(batch)
+    results = []
+    for infile in batch:
+        outfile_abs = output_path(infile, dst_format)
+        partial = partial_output_path(outfile_abs)
+        confirmed = os.path.basename(infile) not in stderr
+        if confirmed:
+            try:
+                confirmed = os.stat(partial).st_mtime >= batch_start - MTIME_SLACK
+            except OSError:
+                confirmed = False
+        # Anything not confirmed is retried singly, which overwrites the partial
+        if confirmed and finish_output(partial, outfile_abs, dst_format) is None:
+            results.append(conversion_result(
+                os.path.abspath(infile), outfile_abs, "ok",
+                f"{os.path.basename(infile)} - {src_format.lower()} → {ext}", per_file,
+                result.returncode
+            ))
+        else:
+            results.append(convert_file(infile, dst_format, options))
+    if all(r["ok"] for r in results):
+        throughput_tracker.observe(pair, sum(sizes), elapsed)
+    return results
+
+def process_batch(batch, options, targets=None):
+    """
+    Worker entry point: convert a batch to each target format in turn, so a
+    source's outputs are written back to back while it is still in the OS
+    cache, and attach source details for the manifest.
+    """
+    results = []
+    for dst_format in targets or parse_formats(options["format_to"]):
+        for result in convert_batch(batch, dst_format, options):
+            result["target"] = dst_format
+            results.append(result)
+    for result in results:
+        try:
+            st = os.stat(result["infile"])
+            result["size"], result["mtime"] = st.st_size, st.st_mtime
+            if result["ok"] and options["manifest_hash"]:
+                result["hash"] = file_hash(result["infile"])
+        except OSError:
+            result.setdefault("size", 0)
+            result.setdefault("mtime", 0.0)
+        result["output_size"] = 0
+        if result["ok"]:
+            try:
+                result["output_size"] = os.path.getsize(result["outfile"])
+            except OSError:
+                pass
+    return results
+
+def copy_sequential(source, destination):
+    """Copy a file in large sequential reads, keeping its timestamps."""
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        shutil.copyfileobj(src, dst, STAGING_CHUNK_BYTES)
+    shutil.copystat(source, destination)
+
+_active_staging = set()
+_active_staging_lock = Lock()
+
+def staging_owner_alive(path):
+    """
+    Whether the process that made a staging folder is still running. Folders
+    are named run_<stamp>_<pid>_<id>; anything else predates owner pids.
+    """
+    try:
+        pid = int(path.name.split("_")[3])
+    except (IndexError, ValueError):
+        return False
+    if pid == os.getpid():
+        return path in _active_staging
+    return process_alive(pid)
+
+class StagingArea:
+    """
+    Converts batches through local copies for slow or network source folders.
+    Sources are copied into the workspace with large sequential reads, nconvert
+    works on the copies, and the outputs are copied back next to the originals.
+    Copy-in, conversion and copy-out run on separate pools so one batch's copies
+    overlap other batches' conversions. Copy-in waits while the workspace would
+    go over the cap; outputs count at their source's size until copied back.
+    """
+
+    def __init__(self, options, pool):
+        self.options = options
+        self.pool = pool
+        self.cap = options["staging_cap_mb"] * 1024 * 1024
+        self.root = STAGING_DIR / f"run_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{id(self):x}"
+        with _active_staging_lock:
+            # Anything whose owning process is gone was left by a crash; other
+            # instances (GUI and --cli) may be staging at the same time
+            if STAGING_DIR.is_dir():
+                for path in STAGING_DIR.iterdir():
+                    if not staging_owner_alive(path):
+                        shutil.rmtree(path, ignore_errors=True)
+            self.root.mkdir(parents=True)
+            _active_staging.add(self.root)
+        self.copy_in = ThreadPoolExecutor(max_workers=STAGING_COPY_WORKERS)
+        self.copy_out = ThreadPoolExecutor(max_workers=STAGING_COPY_WORKERS)
+        self.space = Condition()
+        self.used = 0
+        self.count = 0
+        self.closed = False
+
+    def submit(self, batch, targets=None):
+        """Stage, convert and copy back one batch; returns a Future of its results."""
+        future = Future()
+        self.count += 1
+        folder = self.root / str(self.count)
+        targets = targets or parse_formats(self.options["format_to"])
+        self.copy_in.submit(self._stage_in, future, batch, targets, folder)
+        return future
+
+    def _reserve(self, size):
+        cancel = self.options["cancel"]
+        with self.space:
+            # A batch bigger than the cap still goes through once the workspace is empty
+            while self.used and self.used + size > self.cap and not self.closed and not cancel.is_set():
+                self.space.wait(PROGRESS_UPDATE_INTERVAL)
+            self.used += size
+
+    def _release(self, size):
+        with self.space:
+            self.used -= size
+            self.space.notify_all()
+
+    @staticmethod
+    def _unconverted(infile, targets, status, message):
+        results = []
+        for target in targets:
+            result = conversion_result(
+                os.path.abspath(infile), output_path(infile, target), status, message, 0.0
+            )
+            result.update(target=target, size=0, mtime=0.0, output_size=0)
+            results.append(result)
+        return results
 
-        filename_display = os.path.basename(infile)
+    def _stage_in(self, future, batch, targets, folder):
+        reserved = 0
         try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                shell=False,
-                cwd=working_dir,
-                timeout=30
+            sizes = []
+            for infile in batch:
+                try:
+                    sizes.append(os.path.getsize(infile))
+                except OSError:
+                    sizes.append(0)
+            reserved = sum(sizes) * (1 + len(targets))
+            self._reserve(reserved)
+            folder.mkdir()
+            staged, results = {}, []
+            for infile in batch:
+                name = os.path.basename(infile)
+                if self.closed or self.options["cancel"].is_set():
+                    results.extend(self._unconverted(infile, targets, "cancelled", f"{name} - CANCELLED"))
+                    continue
+                local = str(folder / name)
+                try:
+                    copy_sequential(infile, local)
+                    staged[local] = os.path.abspath(infile)
+                except OSError as e:
+                    results.extend(self._unconverted(
+                        infile, targets, "error", f"{name} - ERROR: could not stage ({e})"
+                    ))
+            if not staged:
+                self._finish(future, results, folder, reserved)
+                return
+            conversion = self.pool.submit(process_batch, list(staged), self.options, targets)
+            conversion.add_done_callback(lambda done: self.copy_out.submit(
+                self._stage_out, future, done, staged, results, folder, reserved
+            ))
+        except RuntimeError:
+            # The engine stopped taking work while this batch was being copied in
+            self._finish(future, None, folder, reserved)
+        except Exception as e:
+            self._finish(future, e, folder, reserved)
+
+    def _stage_out(self, future, conversion, staged, results, folder, reserved):
+        if conversion.cancelled():
+            self._finish(future, None, folder, reserved)
+            return
+        try:
+            for result in conversion.result():
+                original = staged[result["infile"]]
+                outfile = output_path(original, result["target"])
+                if result["ok"]:
+                    partial = partial_output_path(outfile)
+                    try:
+                        copy_sequential(result["outfile"], partial)
+                        replace_durably(partial, outfile)
+                    except OSError as e:
+                        remove_partial_output(partial)
+                        result.update(
+                            ok=False, status="error", output_size=0,
+                            message=f"{os.path.basename(original)} - ERROR: could not copy back ({e})"
+                        )
+                result["infile"], result["outfile"] = original, outfile
+                results.append(result)
+        except Exception as e:
+            results = e
+        self._finish(future, results, folder, reserved)
+
+    def _finish(self, future, outcome, folder, reserved):
+        """Settle a batch's future: results, an exception, or None when it never ran."""
+        shutil.rmtree(folder, ignore_errors=True)
+        self._release(reserved)
+        if outcome is None:
+            # Counts as done for wait(), like a pool future cancelled before it ran
+            future.cancel()
+            future.set_running_or_notify_cancel()
+        elif isinstance(outcome, Exception):
+            future.set_exception(outcome)
+        else:
+            future.set_result(outcome)
+
+    def close(self):
+        """Settle every batch still on its way through, then remove the workspace."""
+        with self.space:
+            self.closed = True
+            self.space.notify_all()
+        self.copy_in.shutdown(wait=True)
+        self.copy_out.shutdown(wait=True)
+        shutil.rmtree(self.root, ignore_errors=True)
+        with _active_staging_lock:
+            _active_staging.discard(self.root)
+
+def current_options():
+    """Snapshot the UI settings so a running conversion ignores later edits."""
+    return {
+        "folder": folder_location,
+        "format_from": format_from,
+        "format_to": format_to,
+        "delete": bool(delete_files_after),
+        "beep": bool(beep_on_complete),
+        "workers": max(1, int(max_workers)),
+        "batch_size": max(1, int(batch_size)),
+        "skip_up_to_date": bool(skip_up_to_date) and not force_reconvert,
+        "manifest_hash": bool(manifest_hash),
+        "scan_include": scan_include,
+        "scan_exclude": scan_exclude,
+        "scan_max_depth": max(0, int(scan_max_depth)),
+        "follow_symlinks": bool(follow_symlinks),
+        "timeout_floor": max(1, int(timeout_floor)),
+        "timeout_ceiling": max(int(timeout_floor), int(timeout_ceiling)),
+        "dedup": bool(dedup_enabled),
+        "dedup_link": dedup_link,
+        "adaptive_workers": bool(adaptive_workers),
+        "min_workers": max(1, min(int(min_workers), int(max_workers))),
+        "low_memory_mb": max(0, int(low_memory_mb)),
+        "schedule": schedule_policy,
+        "staging": bool(staging_enabled),
+        "staging_cap_mb": max(1, int(staging_cap_mb)),
+        "watch_poll_seconds": max(1, int(watch_poll_seconds))
+    }
+
+def format_duration(seconds):
+    seconds = int(max(0, seconds))
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+def progress_stats(done, failed, total, started, finished=False, scanning=False, paused=False):
+    elapsed = time.time() - started
+    processed = done + failed
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    remaining = max(0, total - processed)
+    return {
+        "done": done,
+        "failed": failed,
+        "total": total,
+        "elapsed": elapsed,
+        "rate": rate,
+        "eta": remaining / rate if rate > 0 and not scanning else None,
+        "finished": finished,
+        "scanning": scanning,
+        "paused": paused
+    }
+
+def format_progress(stats):
+    if not stats:
+        return ""
+    processed = stats["done"] + stats["failed"]
+    fraction = processed / stats["total"] if stats["total"] else 1.0
+    filled = int(fraction * PROGRESS_BAR_WIDTH)
+    bar = "█" * filled + "░" * (PROGRESS_BAR_WIDTH - filled)
+    if stats["finished"]:
+        eta = f"Elapsed {format_duration(stats['elapsed'])}"
+    elif stats["paused"]:
+        eta = "Paused"
+    elif stats["scanning"]:
+        eta = "Scanning..."
+    elif stats["eta"] is None:
+        eta = "ETA --:--:--"
+    else:
+        eta = f"ETA {format_duration(stats['eta'])}"
+    total = f"{stats['total']}+" if stats["scanning"] else f"{stats['total']}"
+    text = (
+        f"[{bar}] {fraction:4.0%}  {processed}/{total} files  |  "
+        f"{stats['rate']:.1f} files/s  |  {eta}  |  Failures: {stats['failed']}"
+    )
+    if stats.get("workers") and not stats["finished"]:
+        text += f"  |  Workers {stats['workers'][0]}/{stats['workers'][1]}"
+        if stats.get("held"):
+            text += f" ({stats['held']} large file(s) held, low memory)"
+    return text
+
+def follow_run(updates, on_update):
+    """
+    Drain a run_conversion() stream for a background caller, passing each
+    update and the latest log line to on_update. Returns (final, message):
+    the last update, the only one with the summary fields and None when the
+    run could not start, and the last non-blank log line.
+    """
+    final, message = None, ""
+    for lines, update in updates:
+        final = update
+        if lines:
+            message = lines[-1].strip() or message
+        on_update(update, message)
+    return final, message
+
+def summarize_run(final):
+    """One-line outcome from a run's final stats."""
+    # A run with nothing to do (e.g. everything up to date) says why instead
+    return final.get("message") or (
+        f"{final.get('done', 0)} converted, {final.get('failed', 0)} failed, "
+        f"{final.get('skipped', 0)} skipped in {format_duration(final.get('elapsed', 0))}"
+    )
+
+def scan_producer(options, manifest, dedup, batches, counters, stop):
+    """
+    Producer thread: walk the tree, drop outputs that are up to date, divert
+    duplicates to `dedup` and push (same-directory batch, target formats,
+    the files' sizes) items onto the bounded `batches` queue. Always ends
+    with a None sentinel so the consumer knows discovery has finished.
+    """
+    targets = tuple(parse_formats(options["format_to"]))
+    resume_done = options.get("resume_done") or {}
+
+    def is_current(infile, dst_format):
+        return is_output_current(infile, output_path(infile, dst_format)) or bool(
+            manifest and manifest.is_current(os.path.abspath(infile), dst_format,
+                                             options["manifest_hash"])
+        )
+
+    def needed_targets(infile, size):
+        """Targets infile still has to be converted to; empty when it is handled already."""
+        needed = targets
+        if resume_done:
+            # Converted before the interruption, as long as the output is still there
+            finished = resume_done.get(os.path.abspath(infile), ())
+            needed = tuple(
+                target for target in targets
+                if target not in finished or check_output(output_path(infile, target), target)
             )
-            if result.returncode == 0:
-                files_process_done += 1
-                newly_converted.append(outfile_abs)
-                log.append(f"{filename_display} - {format_from.lower()} → {format_to.lower()}")
+            if not needed:
+                counters["resumed"] += 1
+                counters["resumed_sources"].append(os.path.abspath(infile))
+                return ()
+        if options["skip_up_to_date"]:
+            current = tuple(target for target in needed if is_current(infile, target))
+            needed = tuple(target for target in needed if target not in current)
+            counters["skipped"] += len(current)
+            if not needed:
+                return ()
+        if dedup is not None:
+            try:
+                representative = dedup.representative_for(infile, size)
+            except OSError:
+                representative = None
+            if representative is not None:
+                counters["queued"] += len(needed)
+                dedup.add_duplicate(infile, needed, representative)
+                return ()
+        return needed
+
+    def wanted(entries):
+        for infile, size in entries:
+            if stop.is_set():
+                return
+            counters["found"] += 1
+            try:
+                needed = needed_targets(infile, size)
+            except Exception as e:
+                # One unreadable file must not end discovery for the rest of the tree
+                counters["queued"] += len(targets)
+                counters["scan_failures"].append(
+                    (f"{os.path.basename(infile)} - ERROR (scan: {e})", len(targets))
+                )
+                continue
+            if needed:
+                yield infile, size, needed
+
+    try:
+        for item in iter_batches(wanted(scan_sources(options)), options["batch_size"]):
+            batch, needed, _ = item
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=PROGRESS_UPDATE_INTERVAL)
+                    counters["queued"] += len(batch) * len(needed)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                break
+    except Exception as e:
+        counters["error"] = str(e)
+    finally:
+        counters["scanning"] = False
+        batches.put(None)
+
+def run_conversion(options=None, cancel=None):
+    """
+    Conversion engine. A scanner thread feeds batches through a bounded queue
+    to the worker pool, so converting starts while discovery continues.
+    Yields (new_log_lines, stats) tuples, throttled to one per
+    PROGRESS_UPDATE_INTERVAL, and always ends with the summary lines and
+    final stats. Stats is None when the run could not start (bad folder or
+    target, shutting down); a run with nothing to do still ends with final
+    stats, all counts zero. The run can be stopped through `cancel` (or
+    cancel_conversion()). Every line is also written to the run's log under
+    data/logs, named in the final stats, and each file's progress to a
+    journal so an interrupted run can be resumed by passing resume_options()
+    of its journal. A RunLog passed as options["run_log"] is written to
+    instead and left open for the caller; options["report"] = False skips
+    the per-run report files.
+    """
+    options = dict(options or current_options())
+    options["cancel"] = cancel = cancel or CancelToken()
+    with _active_tokens_lock:
+        _active_tokens.add(cancel)
+    shared_log = options.get("run_log")
+    run_log = shared_log or open_run_log()
+    options["journal"] = journal = open_journal(options)
+    completed = False
+    try:
+        for lines, stats in _run_conversion(options):
+            if run_log:
+                run_log.write(lines)
+                if stats is not None and stats["finished"]:
+                    stats["log"] = str(run_log.path)
+            yield lines, stats
+        completed = True
+    finally:
+        if run_log and not shared_log:
+            run_log.close()
+        if journal:
+            # Anything but a normal end leaves the journal behind for resuming
+            if completed and not _shutdown_requested:
+                journal.finish()
             else:
-                err = result.stderr.strip() or "Unknown error"
-                log.append(f"{filename_display} - FAILED ({err})")
-        except subprocess.TimeoutExpired:
-            log.append(f"{filename_display} - TIMEOUT")
+                journal.close()
+        with _active_tokens_lock:
+            _active_tokens.discard(cancel)
+
+def _run_conversion(options):
+    cancel = options["cancel"]
+    pause = options.get("pause")
+    src_format, dst_format = options["format_from"], options["format_to"]
+    targets = parse_formats(dst_format)
+
+    if _shutdown_requested:
+        yield ["Error: Shutdown in progress."], None
+        return
+
+    if not os.path.isdir(options["folder"]):
+        yield ["Error: Invalid folder location."], None
+        return
+    if not targets:
+        yield ["Error: No target format selected."], None
+        return
+    dst_format = ", ".join(targets)
+
+    manifest = open_manifest()
+    run_id = manifest.start_run(options["folder"], src_format, dst_format) if manifest else None
+    report = open_report() if options.get("report", True) else None
+
+    files_process_done = 0
+    files_process_total = 0
+    failed_count = 0
+    cancelled_count = 0
+    deleted_count = kept_count = 0
+    started = time.time()
+    lines = [f"Scanning and converting with {options['workers']} worker(s)...\n"]
+    if len(targets) > 1:
+        lines[0] = f"Scanning and converting to {dst_format} with {options['workers']} worker(s)...\n"
+    if options.get("resume_from"):
+        lines.insert(0, "Resuming an interrupted run, files it finished are skipped.")
+    last_update = 0.0
+    manifest_rows = []
+
+    def flush_manifest():
+        if manifest and manifest_rows:
+            try:
+                manifest.record(manifest_rows)
+            except sqlite3.Error as e:
+                lines.append(f"! Manifest write failed: {e}")
+        manifest_rows.clear()
+
+    batches = queue.Queue(maxsize=SCAN_QUEUE_BATCHES)
+    counters = {"found": 0, "skipped": 0, "queued": 0, "scanning": True, "error": None,
+                "resumed": 0, "resumed_sources": [], "scan_failures": deque()}
+    journal = options.get("journal")
+
+    def journal_record(event, files, target=None, **fields):
+        if journal:
+            journal.record(event, files, target, **fields)
+    dedup = DedupIndex() if options["dedup"] else None
+    dedup_saved = dedup_bytes = 0
+    # Makespan bookkeeping: wall time from first dispatch to last result, against
+    # the ideal of busy time spread evenly over the workers
+    first_dispatch = last_completion = None
+    busy_seconds = longest_task = 0.0
+
+    def delete_source(infile):
+        nonlocal deleted_count
+        try:
+            os.remove(infile)
+            deleted_count += 1
+            journal_record("deleted", [infile])
         except Exception as e:
-            log.append(f"{filename_display} - ERROR: {str(e)}")
+            lines.append(f"Failed to delete {os.path.basename(infile)}: {e}")
+
+    def collect_scan_failures():
+        nonlocal failed_count
+        failures = counters["scan_failures"]
+        while failures:
+            message, outputs = failures.popleft()
+            failed_count += outputs
+            lines.append(message)
+
+    def collect(results):
+        nonlocal files_process_done, failed_count, cancelled_count, dedup_saved, dedup_bytes
+        nonlocal last_completion, busy_seconds, longest_task, kept_count
+        converted_by_source = {}
+        outcome_by_source = {}  # infile -> (every target ok, any target ok)
+        if results:
+            last_completion = time.time()
+            task_seconds = sum(result["duration"] for result in results)
+            busy_seconds += task_seconds
+            longest_task = max(longest_task, task_seconds)
+        for result in results:
+            every, some = outcome_by_source.get(result["infile"], (True, False))
+            outcome_by_source[result["infile"]] = (every and result["ok"], some or result["ok"])
+            if result["ok"]:
+                files_process_done += 1
+            else:
+                if result["status"] == "cancelled":
+                    cancelled_count += 1
+                else:
+                    failed_count += 1
+            if result.get("duplicate"):
+                if result["ok"]:
+                    dedup_saved += 1
+                    dedup_bytes += result["size"]
+            elif dedup is not None:
+                converted_by_source.setdefault(result["infile"], []).append(result)
+            if result["ok"]:
+                journal_record("done", [result["infile"]], result["target"])
+            elif result["status"] != "cancelled":
+                journal_record("failed", [result["infile"]], result["target"])
+            lines.append(result["message"])
+            if report:
+                report.add(result, result["target"])
+            manifest_rows.append((
+                result["infile"], result["target"], result["size"], result["mtime"],
+                result.get("hash"), result["outfile"], result["duration"], result["status"], run_id
+            ))
+        for infile, source_results in converted_by_source.items():
+            dedup.representative_finished(infile, source_results)
+        # A source's targets all come back in one result set and each output was
+        # checked before its rename, so the original can go straight away; this
+        # keeps the extra disk space near one batch's outputs
+        if options["delete"] and not cancel.is_set() and not _shutdown_requested:
+            for infile, (every, some) in outcome_by_source.items():
+                if every:
+                    delete_source(infile)
+                elif some:
+                    kept_count += 1
+
+    stop = Event()
+    producer = Thread(
+        target=scan_producer,
+        args=(options, manifest, dedup, batches, counters, stop),
+        daemon=True
+    )
+    producer.start()
 
-    # Delete originals if requested
-    if delete_files_after and not _shutdown_requested:
-        deleted_count = 0
-        converted_set = set(newly_converted)
-        for orig in files:
+    governor = None
+    if options["adaptive_workers"]:
+        try:
+            governor = ResourceGovernor(options)
+        except Exception as e:
+            lines.append(f"! Adaptive workers unavailable ({e}), using {options['workers']} worker(s)")
+    held = deque()  # large batches waiting for available memory to recover
+
+    schedule = BatchSchedule(options["schedule"])
+
+    def submit(item):
+        nonlocal first_dispatch
+        batch, needed, _ = item
+        if first_dispatch is None:
+            first_dispatch = time.time()
+        journal_record("converting", batch)
+        if staging is not None:
+            in_flight.add(staging.submit(batch, needed))
+        else:
+            in_flight.add(pool.submit(process_batch, batch, options, needed))
+
+    max_in_flight = options["workers"] * 2
+    in_flight = set()
+    scan_done = False
+    pool = ThreadPoolExecutor(max_workers=options["workers"])
+    staging = None
+    if options["staging"]:
+        try:
+            staging = StagingArea(options, pool)
+        except Exception as e:
+            lines.append(f"! Staging workspace unavailable ({e}), converting in place")
+    try:
+        while True:
             if _shutdown_requested:
+                lines.append("\n! Shutdown requested, stopping...")
+                break
+            if cancel.is_set():
+                lines.append("\n! Conversion cancelled, stopping...")
                 break
-            expected = os.path.splitext(orig)[0] + f".{format_to.lower()}"
-            if expected in converted_set:
+            # Top up the pool; block briefly only when there is nothing to wait on
+            paused = pause is not None and pause.is_set()
+            if governor is not None:
+                # No read-ahead, so the limit is the number of nconvert processes
+                max_in_flight = governor.update()
+                while held and not paused and len(in_flight) < max_in_flight and (
+                        not governor.memory_low or not in_flight):
+                    submit(held.popleft())
+            # Move what the scanner has found into the schedule, then dispatch from it;
+            # discovery order needs no look-ahead, so it keeps the scanner's backpressure
+            window = max_in_flight if schedule.policy == "discovery" else SCHEDULE_WINDOW
+            while not scan_done and len(schedule) < window:
                 try:
-                    os.remove(orig)
-                    deleted_count += 1
-                except Exception as e:
-                    log.append(f"Failed to delete {os.path.basename(orig)}: {e}")
-        if deleted_count:
-            log.append(f"\nDeleted {deleted_count} original file(s)")
+                    item = batches.get(
+                        block=not (in_flight or held or schedule), timeout=PROGRESS_UPDATE_INTERVAL
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    scan_done = True
+                    break
+                journal_record("queued", item[0], targets=list(item[1]))
+                schedule.push(item)
+            while schedule and not paused and len(in_flight) < max_in_flight:
+                item = schedule.pop()
+                if governor is not None and governor.memory_low and max(item[2]) >= LARGE_FILE_BYTES:
+                    held.append(item)
+                    continue
+                submit(item)
+            if dedup is not None and not paused:
+                for duplicate, needed, representative in dedup.take_ready():
+                    journal_record("converting", [duplicate])
+                    in_flight.add(pool.submit(
+                        process_duplicate, duplicate, needed, representative, options
+                    ))
+            if in_flight:
+                finished, in_flight = wait(
+                    in_flight, timeout=PROGRESS_UPDATE_INTERVAL, return_when=FIRST_COMPLETED
+                )
+            else:
+                finished = ()
+                if paused:
+                    cancel.event.wait(PROGRESS_UPDATE_INTERVAL)
+                elif scan_done and not held and not schedule:
+                    break
+            for future in finished:
+                collect(future.result())
+            collect_scan_failures()
+            if len(manifest_rows) >= MANIFEST_FLUSH_ROWS:
+                flush_manifest()
+            files_process_total = counters["queued"]
+            now = time.time()
+            if now - last_update >= PROGRESS_UPDATE_INTERVAL:
+                last_update = now
+                stats = progress_stats(
+                    files_process_done, failed_count, files_process_total, started,
+                    scanning=counters["scanning"], paused=paused
+                )
+                if governor is not None:
+                    stats["workers"] = (governor.limit, governor.maximum)
+                    stats["held"] = sum(len(item[0]) for item in held)
+                yield lines, stats
+                lines = []
+    finally:
+        stop.set()
+        if cancel.is_set():
+            cancel.cancel()  # kill anything a worker started after the flag was set
+        # Drain so a producer blocked on put() can see the stop flag
+        while producer.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        pool.shutdown(wait=True, cancel_futures=True)
+        if staging is not None:
+            staging.close()
+        # Account for work that was already running when the loop stopped
+        for future in in_flight:
+            if not future.cancelled():
+                collect(future.result())
+        collect_scan_failures()
+        flush_manifest()
+
+    if counters["error"]:
+        # Discovery stopped early, so files past this point were never looked at
+        lines.append(f"! Scan error: {counters['error']}")
+        counters["queued"] += 1
+        failed_count += 1
+    files_process_total = counters["queued"]
+    skipped_count = counters["skipped"]
+
+    def nothing_to_do(message):
+        """Final stats for a run that started but found no work (None means it could not start)."""
+        if manifest:
+            manifest.finish_run(run_id, 0, 0, 0, skipped_count)
+            manifest.close()
+        if report:
+            report.discard()
+        stats = progress_stats(0, 0, 0, started, finished=True)
+        stats.update(skipped=skipped_count, cancelled=0, schedule=schedule.policy,
+                     makespan=None, makespan_lower_bound=0.0, message=message)
+        return lines + [message], stats
+
+    if counters["found"] == 0 and files_process_total == 0:
+        yield nothing_to_do(f"No .{src_format.lower()} files found in selected folder.")
+        return
+
+    if files_process_total == 0 and not counters["resumed"] and not _shutdown_requested and not cancel.is_set():
+        yield nothing_to_do(f"All {counters['found']} .{src_format.lower()} file(s) are already up to date.")
+        return
+
+    if skipped_count:
+        lines.append(f"\nSkipped {skipped_count} up-to-date output(s)")
+    if counters["resumed"]:
+        lines.append(f"\nResumed: {counters['resumed']} file(s) were finished before the interruption")
+    if dedup_saved:
+        lines.append(
+            f"\nDeduplicated identical files, "
+            f"saving {dedup_saved} conversion(s) of {dedup_bytes / (1024 * 1024):.1f} MB"
+        )
 
-    # Summary
-    failed = files_process_total - files_process_done
-    log.append("\n" + "─" * 40)
-    log.append("CONVERSION SUMMARY")
-    log.append(f"Total files:      {files_process_total}")
-    log.append(f"Successfully:     {files_process_done}")
-    log.append(f"Failed:           {failed}")
-    log.append("─" * 40)
+    # Originals were deleted as their outputs were checked; the ones a resumed
+    # run skipped may not have been deleted before the interruption
+    if options["delete"] and not cancel.is_set() and not _shutdown_requested:
+        for infile in counters["resumed_sources"]:
+            if not os.path.exists(infile):
+                continue
+            problems = []
+            for target in targets:
+                problem = check_output(output_path(infile, target), target)
+                if problem:
+                    problems.append(f"{target.lower()} output {problem}")
+            if problems:
+                lines.append(f"Kept {os.path.basename(infile)}: {', '.join(problems)}")
+            else:
+                delete_source(infile)
+    if kept_count:
+        lines.append(f"\nKept {kept_count} original(s) with a target that did not convert")
+    if options["delete"] and cancel.is_set():
+        lines.append("\nDeleting originals stopped when the run was cancelled")
+    if deleted_count:
+        lines.append(f"\nDeleted {deleted_count} original file(s)")
 
-    if failed == 0 and files_process_done > 0:
-        log.insert(1, "All files converted successfully ✓\n")
+    # Summary
+    failed = failed_count
+    cancelled = files_process_total - files_process_done - failed_count
+    if failed == 0 and cancelled == 0 and files_process_done > 0:
+        lines.append("\nAll files converted successfully ✓")
+    lines.append("\n" + "─" * 40)
+    lines.append("CONVERSION SUMMARY")
+    if len(targets) > 1:
+        # Counts below are per output, a source makes one output per target
+        lines.append(f"Targets:          {dst_format}")
+        lines.append(f"Source files:     {counters['found']}")
+        lines.append(f"Total outputs:    {files_process_total}")
+    else:
+        lines.append(f"Total files:      {files_process_total}")
+    lines.append(f"Successfully:     {files_process_done}")
+    lines.append(f"Failed:           {failed}")
+    if cancelled:
+        lines.append(f"Cancelled:        {cancelled}")
+    lines.append(f"Skipped:          {skipped_count}")
+    if dedup is not None:
+        lines.append(f"Deduplicated:     {dedup_saved} ({dedup_bytes / (1024 * 1024):.1f} MB not reconverted)")
+    lines.append("─" * 40)
+
+    if manifest:
+        try:
+            manifest.finish_run(run_id, files_process_total, files_process_done, failed, skipped_count)
+        except sqlite3.Error as e:
+            lines.append(f"! Manifest write failed: {e}")
+        manifest.close()
 
     # Beep on completion
-    if beep_on_complete and files_process_done > 0 and not _shutdown_requested:
+    if options["beep"] and files_process_done > 0 and not _shutdown_requested and not cancel.is_set():
         def delayed_beep():
             time.sleep(0.5)
             if os.name == 'nt':
+                import winsound
                 winsound.Beep(1000, 800)
             else:
                 print("\a")
         Thread(target=delayed_beep, daemon=True).start()
 
-    return "\n".join(log)
+    final_stats = progress_stats(
+        files_process_done, failed_count, files_process_total, started, finished=True
+    )
+    final_stats["skipped"] = skipped_count
+    final_stats["cancelled"] = cancelled
+    final_stats["schedule"] = schedule.policy
+    final_stats["makespan"] = (
+        last_completion - first_dispatch if first_dispatch and last_completion else None
+    )
+    final_stats["makespan_lower_bound"] = max(busy_seconds / options["workers"], longest_task)
+    if report:
+        try:
+            final_stats["report"] = report.finish({
+                "folder": options["folder"],
+                "format_from": src_format,
+                "format_to": dst_format,
+                "workers": options["workers"],
+                "skipped": skipped_count,
+                "deduplicated": dedup_saved,
+                "deduplicated_bytes": dedup_bytes,
+                "schedule": schedule.policy,
+                "makespan_seconds": final_stats["makespan"] and round(final_stats["makespan"], 3),
+                "makespan_lower_bound_seconds": round(final_stats["makespan_lower_bound"], 3)
+            })
+        except OSError as e:
+            lines.append(f"! Report write failed: {e}")
+    yield lines, final_stats
+
+def start_conversion(options=None):
+    """
+    Gradio handler: streams the log tail and progress line while converting.
+    Only the last LOG_TAIL_LINES lines are kept; the Log Viewer pages through
+    the full run log on disk.
+    """
+    log = deque(maxlen=LOG_TAIL_LINES)
+    for lines, stats in run_conversion(options):
+        log.extend(lines)
+        if stats is None or stats["finished"]:
+            if stats and stats.get("log"):
+                log.append(f"\nFull log: {stats['log']} (see Log Viewer)")
+            yield "\n".join(log), format_progress(stats), format_report((stats or {}).get("report"))
+        else:
+            yield "\n".join(log), format_progress(stats), ""
+
+# ─── Job Queue ──────────────────────────────────────────────────────────────────
+
+JOB_STATUSES = ["queued", "running", "paused", "done", "failed", "cancelled"]
+
+class JobQueue:
+    """
+    Conversion jobs run one after another by a background thread. Each job
+    holds a snapshot of current_options(); the queue is saved to JOBS_FILE
+    on every change so it survives a restart.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.wakeup = Event()
+        self.jobs = []
+        self.next_id = 1
+        self.thread = None
+        self.running_id = None
+        self.cancel = None
+        self.pause = Event()
+        self.load()
+
+    def load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"! Job queue load warning: {e}")
+            return
+        self.jobs = [job for job in data.get("jobs", []) if job.get("status") in JOB_STATUSES]
+        self.next_id = max([data.get("next_id", 1)] + [job["id"] + 1 for job in self.jobs])
+        # A job that was running when the program stopped starts again from the scan
+        for job in self.jobs:
+            if job["status"] == "running":
+                job["status"] = "queued"
+                job["progress"] = "Interrupted, requeued"
+
+    def save(self):
+        with self.lock:
+            text = json.dumps({"next_id": self.next_id, "jobs": self.jobs}, indent=2)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"! Job queue save warning: {e}")
+
+    def find(self, job_id):
+        for job in self.jobs:
+            if job["id"] == job_id:
+                return job
+        return None
+
+    def add(self, options):
+        options = {key: value for key, value in options.items() if key not in ("cancel", "pause")}
+        with self.lock:
+            job = {
+                "id": self.next_id,
+                "status": "queued",
+                "options": options,
+                "progress": "",
+                "summary": "",
+                "added": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "started": None,
+                "finished": None
+            }
+            self.next_id += 1
+            self.jobs.append(job)
+        self.save()
+        self.wakeup.set()
+        return job
+
+    def set_paused(self, job_id, paused):
+        with self.lock:
+            job = self.find(job_id)
+            if job is None:
+                return f"No job #{job_id}."
+            if paused and job["status"] in ("queued", "running"):
+                if job["id"] == self.running_id:
+                    self.pause.set()
+                job["status"] = "paused"
+            elif not paused and job["status"] == "paused":
+                if job["id"] == self.running_id:
+                    self.pause.clear()
+                    job["status"] = "running"
+                else:
+                    job["status"] = "queued"
+            elif not paused and job["status"] in ("done", "failed", "cancelled"):
+                # Resuming a finished job runs it again
+                job["status"] = "queued"
+                job["progress"] = job["summary"] = ""
+            else:
+                return f"Job #{job_id} is {job['status']}."
+            status = job["status"]
+        self.save()
+        self.wakeup.set()
+        return f"Job #{job_id} is {status}."
+
+    def move(self, job_id, offset):
+        with self.lock:
+            job = self.find(job_id)
+            if job is None:
+                return f"No job #{job_id}."
+            index = self.jobs.index(job)
+            target = max(0, min(len(self.jobs) - 1, index + offset))
+            self.jobs.insert(target, self.jobs.pop(index))
+        self.save()
+        return f"Job #{job_id} moved to position {target + 1}."
+
+    def remove(self, job_id):
+        with self.lock:
+            job = self.find(job_id)
+            if job is None:
+                return f"No job #{job_id}."
+            self.jobs.remove(job)
+            if job["id"] == self.running_id and self.cancel is not None:
+                self.pause.clear()
+                self.cancel.cancel()
+        self.save()
+        return f"Job #{job_id} removed."
+
+    def cancel_job(self, job_id):
+        with self.lock:
+            job = self.find(job_id)
+            if job is None:
+                return f"No job #{job_id}."
+            if job["id"] == self.running_id and self.cancel is not None:
+                self.pause.clear()
+                self.cancel.cancel()
+                return f"Cancelling job #{job_id}..."
+            if job["status"] in ("queued", "paused"):
+                job["status"] = "cancelled"
+            else:
+                return f"Job #{job_id} is {job['status']}."
+        self.save()
+        return f"Job #{job_id} cancelled."
+
+    def rows(self):
+        with self.lock:
+            return [
+                [
+                    job["id"],
+                    job["status"],
+                    job["options"]["folder"],
+                    f"{job['options']['format_from']} → {job['options']['format_to']}",
+                    job["progress"],
+                    job["summary"]
+                ]
+                for job in self.jobs
+            ]
+
+    def start(self):
+        if self.thread is None:
+            self.thread = Thread(target=self._runner, daemon=True)
+            self.thread.start()
+
+    def _next_job(self):
+        with self.lock:
+            for job in self.jobs:
+                if job["status"] == "queued":
+                    job["status"] = "running"
+                    job["started"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                    job["progress"] = "Starting..."
+                    self.running_id = job["id"]
+                    self.cancel = CancelToken(background=True)
+                    self.pause.clear()
+                    return job
+        return None
+
+    def _runner(self):
+        while not _shutdown_requested:
+            job = self._next_job()
+            if job is None:
+                self.wakeup.wait(JOB_POLL_INTERVAL)
+                self.wakeup.clear()
+                continue
+            self.save()
+            try:
+                self._run_job(job)
+            except Exception as e:
+                job["status"] = "failed"
+                job["summary"] = f"Error: {e}"
+            finally:
+                with self.lock:
+                    self.running_id = None
+                    self.cancel = None
+                if job["status"] not in ("queued", "paused"):
+                    job["finished"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                self.save()
+
+    def _run_job(self, job):
+        # Settings added after the job was queued fall back to the current ones
+        options = {**current_options(), **job["options"], "pause": self.pause, "job": job["id"]}
+        # A job interrupted by closing the program picks up where its journal stopped
+        for path, journal_options, _ in unfinished_runs(include_jobs=True):
+            if journal_options.get("job") == job["id"]:
+                options["resume_from"] = str(path)
+                options["resume_done"] = read_journal(path)[1]
+                break
+        last_save = time.time()
+
+        def on_update(update, message):
+            nonlocal last_save
+            if update is not None:
+                job["progress"] = format_progress(update)
+            elif message:
+                job["progress"] = message
+            if time.time() - last_save >= JOB_SAVE_INTERVAL:
+                self.save()
+                last_save = time.time()
+
+        final, message = follow_run(run_conversion(options, self.cancel), on_update)
+        if _shutdown_requested:
+            # A job the user paused stays paused; its journal still resumes it later
+            if job["status"] == "paused":
+                job["progress"] = "Interrupted while paused"
+            else:
+                job["status"] = "queued"
+                job["progress"] = "Interrupted, requeued"
+        elif final is None:
+            job["status"] = "failed"
+            job["summary"] = message
+        elif self.cancel.is_set():
+            job["status"] = "cancelled"
+            job["summary"] = f"{final.get('done', 0)} converted before cancelling"
+        else:
+            job["status"] = "failed" if final.get("failed") else "done"
+            job["summary"] = summarize_run(final)
+
+job_queue = JobQueue(JOBS_FILE)
+
+def queue_job_rows():
+    return job_queue.rows()
+
+def resume_conversion():
+    """Gradio handler: finish the newest interrupted run with its own settings."""
+    runs = unfinished_runs()
+    if not runs:
+        yield "No unfinished run to resume.", "", ""
+        return
+    yield from start_conversion(resume_options(runs[0][0]))
+
+# ─── Watch Folder ───────────────────────────────────────────────────────────────
+
+class InotifyTree:
+    """
+    Recursive inotify watch through libc, one watch per directory. Raises
+    OSError where inotify is missing (Windows, macOS) or the per-user watch
+    limit is reached, so the caller can fall back to polling.
+    """
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, root, exclude=(), max_depth=0):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.skip_dir = os.path.normcase(os.path.abspath(workspace_path))
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}  # watch descriptor -> (directory, depth)
+        try:
+            self.add_tree(root, 0)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, top, depth):
+        """Watch top and its subdirectories; returns the files already in them."""
+        files = []
+        pending = [(top, depth)]
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        while pending:
+            path, level = pending.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if errno in (28, 24):  # ENOSPC, EMFILE: out of watches
+                    raise OSError(errno, f"inotify watch limit reached at {path}")
+                continue  # vanished or unreadable
+            self.dirs[wd] = (path, level)
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if self.exclude and matches_any(entry.name, self.exclude):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.max_depth and level >= self.max_depth:
+                                continue
+                            if os.path.normcase(entry.path) != self.skip_dir:
+                                pending.append((entry.path, level + 1))
+                        else:
+                            files.append(entry.path)
+            except OSError:
+                pass
+        return files
+
+    def read(self, timeout):
+        """
+        Wait up to timeout for events; returns (paths, overflow), where paths
+        were created or written and overflow means events were lost.
+        """
+        paths, overflow = [], False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return paths, overflow
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return paths, overflow
+        offset = 0
+        while offset + self.EVENT.size <= len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            if wd not in self.dirs or not name:
+                continue
+            directory, level = self.dirs[wd]
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if self.exclude and matches_any(os.path.basename(path), self.exclude):
+                    continue
+                if (not self.max_depth or level < self.max_depth) and (
+                        os.path.normcase(path) != self.skip_dir):
+                    # Files can land in a new folder before its watch exists
+                    paths.extend(self.add_tree(path, level + 1))
+            else:
+                paths.append(path)
+        return paths, overflow
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class FolderWatcher:
+    """
+    Watch mode: follows a folder tree for new or changed source files and
+    converts them through the normal engine once they have stopped changing
+    for WATCH_SETTLE_SECONDS. Uses inotify where available, otherwise lists
+    the tree every options["watch_poll_seconds"] and compares sizes and
+    mtimes. Files already there when watching starts are left to a normal
+    run. All rounds of one session write to a single run log and skip the
+    per-run report files.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.thread = None
+        self.stop_event = Event()
+        self.cancel = None
+        self.status = {}
+
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, options):
+        if self.running():
+            return "Already watching."
+        if not os.path.isdir(options["folder"]):
+            return "Error: Invalid folder location."
+        if not parse_formats(options["format_to"]):
+            return "Error: No target format selected."
+        options = {key: value for key, value in options.items() if key not in ("cancel", "pause")}
+        options["beep"] = False
+        options["report"] = False
+        self.stop_event.clear()
+        with self.lock:
+            self.status = {
+                "folder": options["folder"], "backend": "starting", "since": time.strftime("%H:%M:%S"),
+                "pending": 0, "rounds": 0, "converted": 0, "failed": 0, "progress": "", "last": ""
+            }
+        self.thread = Thread(target=self._run, args=(options,), daemon=True)
+        self.thread.start()
+        return f"Watching {options['folder']}."
+
+    def stop(self):
+        if not self.running():
+            return "Not watching."
+        self.stop_event.set()
+        with self.lock:
+            if self.cancel is not None:
+                self.cancel.cancel()
+        return "Stopping watch..."
+
+    def describe(self):
+        with self.lock:
+            status = dict(self.status)
+        if not status:
+            return "Not watching."
+        state = "Watching" if self.running() else "Stopped watching"
+        lines = [
+            f"{state} {status['folder']} ({status['backend']}) since {status['since']}",
+            f"Waiting to settle: {status['pending']} file(s)",
+            f"Rounds: {status['rounds']}, converted {status['converted']}, failed {status['failed']}"
+        ]
+        if status["progress"]:
+            lines.append(status["progress"])
+        elif status["last"]:
+            lines.append(status["last"])
+        return "\n".join(lines)
+
+    def _update(self, **fields):
+        with self.lock:
+            self.status.update(fields)
+
+    def _run(self, options):
+        extension = f".{options['format_from'].lower()}"
+        include = parse_patterns(options["scan_include"])
+        exclude = parse_patterns(options["scan_exclude"])
+
+        def wanted(path):
+            name = os.path.basename(path)
+            return (name.lower().endswith(extension) and PARTIAL_OUTPUT_TAG not in name
+                    and not (include and not matches_any(name, include))
+                    and not (exclude and matches_any(name, exclude)))
+
+        def listing():
+            return {
+                path: (size, mtime) for path, size, mtime in scan_tree(
+                    options["folder"], [extension], include=include, exclude=exclude,
+                    max_depth=options["scan_max_depth"], follow_links=options["follow_symlinks"],
+                    with_mtime=True
+                )
+            }
+
+        inotify = None
+        try:
+            inotify = InotifyTree(options["folder"], exclude, options["scan_max_depth"])
+            self._update(backend="inotify")
+        except (OSError, AttributeError) as e:
+            self._update(backend=f"polling every {options['watch_poll_seconds']}s")
+            print(f"! Watch mode is polling ({e})")
+        known = listing() if inotify is None else {}
+        watch_started = last_poll = time.time()
+        converted = {}  # path -> (size, mtime) it had when converted
+        pending = {}  # path -> ((size, mtime), unchanged since) or None until first stat
+        last_round = 0.0
+        options["run_log"] = run_log = open_run_log()
+        try:
+            while not self.stop_event.is_set() and not _shutdown_requested:
+                changed = []
+                if inotify is not None:
+                    paths, overflow = inotify.read(PROGRESS_UPDATE_INTERVAL * 2)
+                    changed.extend(path for path in paths if wanted(path))
+                    if overflow:
+                        # Events were dropped; relist and take anything new since watching began
+                        changed.extend(
+                            path for path, sig in listing().items()
+                            if sig[1] >= watch_started and converted.get(path) != sig
+                        )
+                else:
+                    self.stop_event.wait(PROGRESS_UPDATE_INTERVAL * 2)
+                    if time.time() - last_poll >= options["watch_poll_seconds"]:
+                        last_poll = time.time()
+                        current = listing()
+                        changed.extend(path for path, sig in current.items() if known.get(path) != sig)
+                        known = current
+                for path in changed:
+                    pending[path] = None
+
+                # Debounce: convert a file once its size and mtime stop changing
+                now = time.time()
+                ready = []
+                for path in list(pending):
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        del pending[path]
+                        continue
+                    signature = (st.st_size, st.st_mtime)
+                    if pending[path] is None or pending[path][0] != signature:
+                        pending[path] = (signature, now)
+                    elif now - pending[path][1] >= WATCH_SETTLE_SECONDS:
+                        ready.append(path)
+                self._update(pending=len(pending) - len(ready))
+                if ready and now - last_round >= WATCH_ROUND_INTERVAL:
+                    last_round = now
+                    for path in ready:
+                        converted[path] = pending.pop(path)[0]
+                    self._convert(options, ready)
+        except Exception as e:
+            self._update(last=f"Watch stopped by an error: {e}")
+        finally:
+            if inotify is not None:
+                inotify.close()
+            if run_log:
+                run_log.close()
+            self._update(pending=0, progress="")
+
+    def _convert(self, options, files):
+        with self.lock:
+            self.cancel = CancelToken(background=True)
+        round_options = {**options, "files": sorted(files)}
+        started = time.strftime("%H:%M:%S")
+        if options["run_log"]:
+            options["run_log"].write(["", f"=== Watch round at {started}: {len(files)} file(s) ==="])
+
+        def on_update(update, message):
+            if update is not None:
+                self._update(progress=f"Converting {len(files)} file(s): {format_progress(update)}")
+
+        try:
+            final, message = follow_run(run_conversion(round_options, self.cancel), on_update)
+        finally:
+            with self.lock:
+                self.cancel = None
+        with self.lock:
+            self.status["rounds"] += 1
+            if final is None:
+                self.status["last"] = f"Round at {started}: {message}"
+            else:
+                self.status["converted"] += final.get("done", 0)
+                self.status["failed"] += final.get("failed", 0)
+                self.status["last"] = f"Round at {started}: {summarize_run(final)}"
+            self.status["progress"] = ""
+
+folder_watcher = FolderWatcher()
+
+def start_watching():
+    return folder_watcher.start(current_options()), folder_watcher.describe()
+
+def stop_watching():
+    return folder_watcher.stop(), folder_watcher.describe()
 
 # ─── UI ─────────────────────────────────────────────────────────────────────────
 
 def create_interface():
+    # Imported here so headless runs (--cli) never load gradio or tkinter
+    import gradio as gr
+    from tkinter import filedialog
+    mark_startup("import gradio and tkinter")
+
     css = """
     button, .gr-button {
         min-height: 80px !important;
@@ -391,6 +3249,12 @@ def create_interface():
     with gr.Blocks(title="NConvert Batch Converter", css=css) as demo:
         gr.Markdown("# NConvert Batch Image Converter")
 
+        unfinished = unfinished_runs()
+        with gr.Row(visible=bool(unfinished)) as resume_row:
+            gr.Markdown(describe_unfinished_run(unfinished[0]) if unfinished else "")
+            resume_btn = gr.Button("Resume Remaining Files", variant="primary", scale=1)
+            discard_btn = gr.Button("Discard", scale=1)
+
         with gr.Row():
             folder_txt = gr.Textbox(
                 label="Folder Location",
@@ -409,8 +3273,9 @@ def create_interface():
             )
             to_dd = gr.Dropdown(
                 choices=allowed_formats,
-                value=format_to,
-                label="Convert To",
+                value=parse_formats(format_to),
+                label="Convert To (one or more)",
+                multiselect=True,
                 scale=1
             )
             with gr.Column(scale=1):
@@ -422,6 +3287,52 @@ def create_interface():
                     label="Beep on completion",
                     value=beep_on_complete
                 )
+                skip_cb = gr.Checkbox(
+                    label="Skip up-to-date outputs",
+                    value=skip_up_to_date
+                )
+                force_cb = gr.Checkbox(
+                    label="Force reconvert all",
+                    value=force_reconvert
+                )
+                hash_cb = gr.Checkbox(
+                    label="Verify by content hash",
+                    value=manifest_hash
+                )
+            with gr.Column(scale=1):
+                timeout_floor_num = gr.Number(
+                    label="Timeout floor (s)",
+                    value=timeout_floor,
+                    precision=0,
+                    minimum=1
+                )
+                timeout_ceiling_num = gr.Number(
+                    label="Timeout ceiling (s)",
+                    value=timeout_ceiling,
+                    precision=0,
+                    minimum=1
+                )
+            with gr.Column(scale=1):
+                workers_num = gr.Number(
+                    label="Workers",
+                    value=max_workers,
+                    precision=0,
+                    minimum=1
+                )
+                batch_num = gr.Number(
+                    label="Files per nconvert call",
+                    value=batch_size,
+                    precision=0,
+                    minimum=1
+                )
+
+        with gr.Row():
+            progress_box = gr.Textbox(
+                label="Progress",
+                lines=1,
+                max_lines=1,
+                interactive=False
+            )
 
         with gr.Row():
             result_box = gr.Textbox(
@@ -434,8 +3345,211 @@ def create_interface():
 
         with gr.Row():
             convert_btn = gr.Button("Start Conversion", variant="primary", scale=4)
+            cancel_btn = gr.Button("Cancel", scale=1)
             exit_btn = gr.Button("Exit", variant="stop", scale=1)
 
+        with gr.Accordion("Run Statistics", open=False):
+            stats_box = gr.Textbox(
+                label="Timing Report",
+                lines=15,
+                max_lines=30,
+                interactive=False,
+                show_copy_button=True
+            )
+
+        with gr.Accordion("Scan Options", open=False):
+            with gr.Row():
+                include_txt = gr.Textbox(
+                    label="Include patterns (file names, comma separated)",
+                    value=scan_include,
+                    placeholder="e.g. IMG_*, *_final*",
+                    scale=2
+                )
+                exclude_txt = gr.Textbox(
+                    label="Exclude patterns (file or folder names, comma separated)",
+                    value=scan_exclude,
+                    scale=2
+                )
+                depth_num = gr.Number(
+                    label="Max depth (0 = unlimited)",
+                    value=scan_max_depth,
+                    precision=0,
+                    minimum=0,
+                    scale=1
+                )
+                symlink_cb = gr.Checkbox(
+                    label="Follow folder symlinks",
+                    value=follow_symlinks,
+                    scale=1
+                )
+            with gr.Row():
+                dedup_cb = gr.Checkbox(
+                    label="Convert identical files once",
+                    value=dedup_enabled,
+                    scale=1
+                )
+                dedup_dd = gr.Dropdown(
+                    choices=DEDUP_LINK_MODES,
+                    value=dedup_link,
+                    label="Duplicate outputs",
+                    scale=1
+                )
+
+            with gr.Row():
+                schedule_dd = gr.Dropdown(
+                    choices=SCHEDULE_POLICIES,
+                    value=schedule_policy,
+                    label="Processing order (largest first shortens runs with a few big files)",
+                    scale=1
+                )
+
+        with gr.Accordion("Resource Limits", open=False):
+            with gr.Row():
+                adaptive_cb = gr.Checkbox(
+                    label="Adapt workers to CPU, memory and disk load",
+                    value=adaptive_workers,
+                    scale=2
+                )
+                min_workers_num = gr.Number(
+                    label="Min workers",
+                    value=min_workers,
+                    precision=0,
+                    minimum=1,
+                    scale=1
+                )
+                low_memory_num = gr.Number(
+                    label="Hold large files below free memory (MB)",
+                    value=low_memory_mb,
+                    precision=0,
+                    minimum=0,
+                    scale=1
+                )
+            with gr.Row():
+                staging_cb = gr.Checkbox(
+                    label="Stage files through the local workspace (for network folders)",
+                    value=staging_enabled,
+                    scale=2
+                )
+                staging_cap_num = gr.Number(
+                    label="Workspace cap (MB)",
+                    value=staging_cap_mb,
+                    precision=0,
+                    minimum=1,
+                    scale=1
+                )
+
+        with gr.Accordion("Log Viewer", open=False):
+            with gr.Row():
+                log_dd = gr.Dropdown(
+                    choices=[path.name for path in list_run_logs()],
+                    value=next((path.name for path in list_run_logs()), None),
+                    label="Run log",
+                    scale=2
+                )
+                log_search_txt = gr.Textbox(
+                    label="Search",
+                    placeholder="text to find, e.g. a file or folder name",
+                    scale=2
+                )
+                log_failures_cb = gr.Checkbox(
+                    label="Failures only",
+                    value=False,
+                    scale=1
+                )
+            log_view = gr.Textbox(
+                label="Log",
+                lines=20,
+                max_lines=20,
+                interactive=False,
+                show_copy_button=True
+            )
+            with gr.Row():
+                log_prev_btn = gr.Button("Previous Page", scale=1)
+                log_page_num = gr.Number(
+                    label="Page",
+                    value=1,
+                    precision=0,
+                    minimum=1,
+                    scale=1
+                )
+                log_next_btn = gr.Button("Next Page", scale=1)
+                log_status_box = gr.Textbox(
+                    label="Lines",
+                    lines=1,
+                    max_lines=1,
+                    interactive=False,
+                    scale=2
+                )
+                log_refresh_btn = gr.Button("Refresh Logs", scale=1)
+
+        with gr.Accordion("Conversion History", open=False):
+            history_df = gr.Dataframe(
+                headers=["Run", "Started", "Duration", "Folder", "Formats",
+                         "Total", "Converted", "Failed", "Skipped"],
+                value=manifest_history,
+                interactive=False
+            )
+            with gr.Row():
+                history_btn = gr.Button("Refresh History", scale=1)
+                compact_btn = gr.Button("Compact Manifest", scale=1)
+
+        with gr.Accordion("Job Queue", open=False):
+            jobs_df = gr.Dataframe(
+                headers=["Job", "Status", "Folder", "Formats", "Progress", "Summary"],
+                value=queue_job_rows,
+                interactive=False
+            )
+            with gr.Row():
+                job_num = gr.Number(
+                    label="Job (click a row)",
+                    value=None,
+                    precision=0,
+                    minimum=1,
+                    scale=1
+                )
+                job_status_box = gr.Textbox(
+                    label="Queue Status",
+                    lines=1,
+                    max_lines=1,
+                    interactive=False,
+                    scale=3
+                )
+            with gr.Row():
+                queue_btn = gr.Button("Add Current Settings", variant="primary", scale=2)
+                job_pause_btn = gr.Button("Pause", scale=1)
+                job_resume_btn = gr.Button("Resume", scale=1)
+                job_up_btn = gr.Button("Move Up", scale=1)
+                job_down_btn = gr.Button("Move Down", scale=1)
+                job_cancel_btn = gr.Button("Cancel Job", scale=1)
+                job_remove_btn = gr.Button("Remove", variant="stop", scale=1)
+            jobs_timer = gr.Timer(2.0)
+
+        with gr.Accordion("Watch Folder", open=False):
+            watch_status_box = gr.Textbox(
+                label="Watch Status",
+                value=folder_watcher.describe,
+                lines=4,
+                max_lines=4,
+                interactive=False
+            )
+            with gr.Row():
+                watch_start_btn = gr.Button("Start Watching", variant="primary", scale=2)
+                watch_stop_btn = gr.Button("Stop Watching", scale=1)
+                watch_poll_num = gr.Number(
+                    label="Poll every (s) without inotify",
+                    value=watch_poll_seconds,
+                    precision=0,
+                    minimum=1,
+                    scale=1
+                )
+            watch_message_box = gr.Textbox(
+                label="Watch Message",
+                lines=1,
+                max_lines=1,
+                interactive=False
+            )
+            watch_timer = gr.Timer(2.0)
+
         # ─── Event Handlers ─────────────────────────────────────────────────────
 
         def browse_folder():
@@ -449,6 +3563,46 @@ def create_interface():
             set_folder_location(new_location)
             return new_location, ""
 
+        def add_job():
+            job = job_queue.add(current_options())
+            return job_queue.rows(), f"Queued job #{job['id']}.", job["id"]
+
+        def pick_job(evt: gr.SelectData):
+            return evt.row_value[0]
+
+        def job_action(action):
+            def handler(job_id):
+                if not job_id:
+                    return job_queue.rows(), "Select a job first."
+                return job_queue.rows(), action(int(job_id))
+            return handler
+
+        def show_log(name, query, failures_only, page):
+            if not name:
+                return "", 1, "No run logs yet."
+            text, page, pages, matches = read_log_page(
+                DATA_DIR / LOGS_DIR.name / name, query, failures_only, page
+            )
+            return text, page, f"Page {page} of {pages}, {matches:,} matching line(s)"
+
+        def show_first_page(name, query, failures_only, page):
+            return show_log(name, query, failures_only, 1)
+
+        def page_step(offset):
+            def handler(name, query, failures_only, page):
+                return show_log(name, query, failures_only, (page or 1) + offset)
+            return handler
+
+        def refresh_logs():
+            names = [path.name for path in list_run_logs()]
+            return gr.Dropdown(choices=names, value=names[0] if names else None)
+
+        def hide_resume():
+            return gr.Row(visible=False)
+
+        def discard_resume():
+            return gr.Row(visible=False), discard_unfinished_runs()
+
         def handle_exit():
             # Run exit in separate thread to avoid blocking Gradio event loop
             exit_thread = Thread(target=graceful_shutdown, daemon=True)
@@ -473,19 +3627,235 @@ def create_interface():
         to_dd.change(set_format_to, inputs=to_dd)
         delete_cb.change(set_delete_files_after, inputs=delete_cb)
         beep_cb.change(set_beep, inputs=beep_cb)
+        skip_cb.change(set_skip_up_to_date, inputs=skip_cb)
+        force_cb.change(set_force_reconvert, inputs=force_cb)
+        hash_cb.change(set_manifest_hash, inputs=hash_cb)
+        include_txt.change(set_scan_include, inputs=include_txt)
+        exclude_txt.change(set_scan_exclude, inputs=exclude_txt)
+        depth_num.change(set_scan_max_depth, inputs=depth_num)
+        symlink_cb.change(set_follow_symlinks, inputs=symlink_cb)
+        dedup_cb.change(set_dedup_enabled, inputs=dedup_cb)
+        dedup_dd.change(set_dedup_link, inputs=dedup_dd)
+        schedule_dd.change(set_schedule_policy, inputs=schedule_dd)
+        workers_num.change(set_max_workers, inputs=workers_num)
+        adaptive_cb.change(set_adaptive_workers, inputs=adaptive_cb)
+        min_workers_num.change(set_min_workers, inputs=min_workers_num)
+        low_memory_num.change(set_low_memory_mb, inputs=low_memory_num)
+        staging_cb.change(set_staging_enabled, inputs=staging_cb)
+        staging_cap_num.change(set_staging_cap_mb, inputs=staging_cap_num)
+        watch_poll_num.change(set_watch_poll_seconds, inputs=watch_poll_num)
+        batch_num.change(set_batch_size, inputs=batch_num)
+        timeout_floor_num.change(set_timeout_floor, inputs=timeout_floor_num)
+        timeout_ceiling_num.change(set_timeout_ceiling, inputs=timeout_ceiling_num)
 
         convert_btn.click(
             start_conversion,
-            outputs=result_box
+            outputs=[result_box, progress_box, stats_box]
+        )
+
+        cancel_btn.click(
+            cancel_conversion,
+            outputs=progress_box
+        )
+
+        resume_btn.click(hide_resume, outputs=resume_row)
+        resume_btn.click(
+            resume_conversion,
+            outputs=[result_box, progress_box, stats_box]
         )
+        discard_btn.click(discard_resume, outputs=[resume_row, result_box])
 
         exit_btn.click(
             fn=handle_exit,
             outputs=result_box
         )
 
+        log_inputs = [log_dd, log_search_txt, log_failures_cb, log_page_num]
+        log_outputs = [log_view, log_page_num, log_status_box]
+        log_dd.change(show_first_page, inputs=log_inputs, outputs=log_outputs)
+        log_search_txt.submit(show_first_page, inputs=log_inputs, outputs=log_outputs)
+        log_failures_cb.change(show_first_page, inputs=log_inputs, outputs=log_outputs)
+        log_page_num.submit(show_log, inputs=log_inputs, outputs=log_outputs)
+        log_prev_btn.click(page_step(-1), inputs=log_inputs, outputs=log_outputs)
+        log_next_btn.click(page_step(1), inputs=log_inputs, outputs=log_outputs)
+        log_refresh_btn.click(refresh_logs, outputs=log_dd)
+
+        history_btn.click(manifest_history, outputs=history_df)
+        compact_btn.click(compact_manifest, outputs=result_box)
+
+        queue_btn.click(add_job, outputs=[jobs_df, job_status_box, job_num])
+        jobs_df.select(pick_job, outputs=job_num)
+        for button, action in (
+            (job_pause_btn, lambda job_id: job_queue.set_paused(job_id, True)),
+            (job_resume_btn, lambda job_id: job_queue.set_paused(job_id, False)),
+            (job_up_btn, lambda job_id: job_queue.move(job_id, -1)),
+            (job_down_btn, lambda job_id: job_queue.move(job_id, 1)),
+            (job_cancel_btn, job_queue.cancel_job),
+            (job_remove_btn, job_queue.remove)
+        ):
+            button.click(job_action(action), inputs=job_num, outputs=[jobs_df, job_status_box])
+        jobs_timer.tick(queue_job_rows, outputs=jobs_df)
+
+        watch_start_btn.click(start_watching, outputs=[watch_message_box, watch_status_box])
+        watch_stop_btn.click(stop_watching, outputs=[watch_message_box, watch_status_box])
+        watch_timer.tick(folder_watcher.describe, outputs=watch_status_box)
+
     return demo
 
+# ─── Command Line ───────────────────────────────────────────────────────────────
+
+CLI_PROGRESS_INTERVAL = 10.0  # seconds between progress lines when output is not a terminal
+
+def parse_cli_args(argv):
+    defaults = current_options()
+    parser = argparse.ArgumentParser(
+        prog="program.py --cli",
+        description="Convert a folder tree with nconvert without starting the web interface. "
+                    "Options left out fall back to the saved session settings."
+    )
+    parser.add_argument("--cli", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("folder", nargs="?", default=defaults["folder"],
+                        help="folder to convert recursively")
+    parser.add_argument("--from", dest="format_from", default=defaults["format_from"],
+                        help="source format, e.g. PSPIMAGE")
+    parser.add_argument("--to", dest="format_to", default=defaults["format_to"],
+                        help="target format(s), comma separated, e.g. JPEG,WEBP")
+    parser.add_argument("--delete", action=argparse.BooleanOptionalAction, default=defaults["delete"],
+                        help="delete originals after a successful conversion")
+    parser.add_argument("--workers", type=int, default=defaults["workers"],
+                        help="worker count, or the upper bound with --adaptive-workers")
+    parser.add_argument("--adaptive-workers", action=argparse.BooleanOptionalAction,
+                        default=defaults["adaptive_workers"],
+                        help="scale workers with CPU, memory and disk load")
+    parser.add_argument("--min-workers", type=int, default=defaults["min_workers"])
+    parser.add_argument("--schedule", choices=SCHEDULE_POLICIES, default=defaults["schedule"],
+                        help="processing order")
+    parser.add_argument("--batch-size", type=int, default=defaults["batch_size"],
+                        help="files per nconvert call")
+    parser.add_argument("--staging", action=argparse.BooleanOptionalAction, default=defaults["staging"],
+                        help="convert through local copies in the workspace folder")
+    parser.add_argument("--skip-up-to-date", action=argparse.BooleanOptionalAction,
+                        default=defaults["skip_up_to_date"])
+    parser.add_argument("--report", help="also copy the run report here (.json, or .csv for per-file rows)")
+    parser.add_argument("--resume", action="store_true",
+                        help="finish the most recent interrupted run instead, with its own settings")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and convert new or changed files as they arrive, until Ctrl+C")
+    parser.add_argument("--watch-interval", type=int, default=defaults["watch_poll_seconds"],
+                        help="seconds between folder listings in --watch where inotify is unavailable")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup phase took")
+    return parser.parse_args(argv)
+
+def run_cli(argv):
+    """
+    Headless entry point: runs the same engine as the Start button and prints
+    the log and progress to stdout. Returns 0 when every file converted or
+    there was nothing to do, 1 when any failed or the run was cancelled, and
+    2 when it could not start.
+    """
+    args = parse_cli_args(argv)
+    mark_startup("parse arguments")
+    if args.profile_startup:
+        print_startup_profile()
+    unfinished = unfinished_runs()
+    if args.resume:
+        if not unfinished:
+            print("Error: No unfinished run to resume.", file=sys.stderr)
+            return 2
+        print(describe_unfinished_run(unfinished[0]))
+        options = resume_options(unfinished[0][0])
+    elif not os.path.isdir(args.folder):
+        print(f"Error: Invalid folder location: {args.folder}", file=sys.stderr)
+        return 2
+    else:
+        if unfinished:
+            print(describe_unfinished_run(unfinished[0]) + " Add --resume to finish it.")
+        options = current_options()
+        options.update({
+            "folder": os.path.abspath(args.folder),
+            "format_from": args.format_from.upper(),
+            "format_to": ", ".join(parse_formats(args.format_to)),
+            "delete": args.delete,
+            "beep": False,
+            "workers": max(1, args.workers),
+            "adaptive_workers": args.adaptive_workers,
+            "min_workers": max(1, min(args.min_workers, args.workers)),
+            "schedule": args.schedule,
+            "batch_size": max(1, args.batch_size),
+            "staging": args.staging,
+            "skip_up_to_date": args.skip_up_to_date
+        })
+
+    if args.watch:
+        if args.resume:
+            print("Error: --watch and --resume cannot be combined.", file=sys.stderr)
+            return 2
+        options["watch_poll_seconds"] = max(1, args.watch_interval)
+        return watch_cli(options)
+
+    # Ctrl+C cancels the run cleanly so the summary and report still get written
+    cancel = CancelToken()
+    signal.signal(signal.SIGINT, lambda sig, frame: cancel.cancel())
+
+    interactive = sys.stdout.isatty()
+    last_progress = 0.0
+    stats = None
+    for lines, update in run_conversion(options, cancel):
+        stats = update
+        finished = stats is None or stats["finished"]
+        if interactive and lines and last_progress:
+            print()
+        for line in lines:
+            print(line)
+        if stats is None:
+            continue
+        now = time.time()
+        if interactive:
+            print("\r" + format_progress(stats), end="", flush=True)
+            last_progress = now
+            if finished:
+                print()
+        elif finished or now - last_progress >= CLI_PROGRESS_INTERVAL:
+            print(format_progress(stats), flush=True)
+            last_progress = now
+
+    if stats and stats.get("log"):
+        print(f"Log: {stats['log']}")
+    summary = (stats or {}).get("report")
+    if summary:
+        print(f"Report: {summary['json']}")
+        if args.report:
+            source = summary["csv"] if args.report.lower().endswith(".csv") else summary["json"]
+            try:
+                shutil.copyfile(source, args.report)
+                print(f"Report copied to {args.report}")
+            except OSError as e:
+                print(f"! Report copy failed: {e}", file=sys.stderr)
+
+    if stats is None:
+        return 2
+    return 1 if stats["failed"] or cancel.is_set() or stats["done"] < stats["total"] else 0
+
+def watch_cli(options):
+    """--watch: convert new files as they settle and print each round until Ctrl+C."""
+    message = folder_watcher.start(options)
+    print(message)
+    if not folder_watcher.running():
+        return 2
+    signal.signal(signal.SIGINT, lambda sig, frame: folder_watcher.stop())
+    print("Press Ctrl+C to stop watching.")
+    shown = ""
+    while folder_watcher.running():
+        folder_watcher.thread.join(PROGRESS_UPDATE_INTERVAL * 2)
+        with folder_watcher.lock:
+            last = folder_watcher.status["last"]
+        if last != shown:
+            print(last, flush=True)
+            shown = last
+    print(folder_watcher.describe())
+    return 1 if folder_watcher.status["failed"] else 0
+
 # ─── Launcher ───────────────────────────────────────────────────────────────────
 
 def find_free_port(start=7860, attempts=12):
@@ -495,14 +3865,42 @@ def find_free_port(start=7860, attempts=12):
                 return p
     return None
 
-def close_old_gradio(port):
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            cmd = ' '.join(proc.info['cmdline'] or [])
-            if 'gradio' in cmd.lower() and f"port {port}" in cmd:
-                proc.terminate()
-        except:
-            pass
+def close_old_gradio():
+    """
+    Stop a previous instance recorded in the pidfile. Only the recorded pid is
+    inspected, and psutil is only loaded when the file is there, which after
+    a clean exit it is not.
+    """
+    try:
+        pid = int(json.loads(PID_FILE.read_text(encoding="utf-8"))["pid"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return
+    if pid == os.getpid():
+        return
+    try:
+        import psutil
+        proc = psutil.Process(pid)
+        # The pid may have been reused by an unrelated process since
+        if any(os.path.basename(arg) == os.path.basename(__file__) for arg in proc.cmdline()):
+            proc.terminate()
+            proc.wait(timeout=5)
+            print(f"Closed previous instance (pid {pid})")
+    except Exception:
+        pass
+
+def write_pidfile(port):
+    try:
+        DATA_DIR.mkdir(exist_ok=True)
+        PID_FILE.write_text(json.dumps({"pid": os.getpid(), "port": port}), encoding="utf-8")
+    except OSError as e:
+        print(f"! Pidfile warning: {e}")
+
+def remove_pidfile():
+    try:
+        if int(json.loads(PID_FILE.read_text(encoding="utf-8"))["pid"]) == os.getpid():
+            PID_FILE.unlink()
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
 
 def launch():
     global global_demo
@@ -511,19 +3909,27 @@ def launch():
         print("Python 3.9 or newer required")
         sys.exit(1)
 
+    close_old_gradio()
     port = find_free_port()
     if not port:
         print("No free port found in range 7860–7871")
         sys.exit(1)
-
-    close_old_gradio(port)
+    write_pidfile(port)
+    atexit.register(remove_pidfile)
+    mark_startup("old instance check")
 
     print(f"Launching interface on http://localhost:{port}")
     print(f"OS Version: {WINDOWS_VERSION or 'Non-Windows'}")
-    Timer(2.5, lambda: webbrowser.open(f"http://localhost:{port}")).start()
+
+    def open_browser():
+        import webbrowser
+        webbrowser.open(f"http://localhost:{port}")
+    Timer(2.5, open_browser).start()
 
     demo = create_interface()
     global_demo = demo
+    mark_startup("build interface")
+    job_queue.start()
 
     # Setup signal handlers for clean exit on Ctrl+C
     def signal_handler(sig, frame):
@@ -543,10 +3949,20 @@ def launch():
         share=False,
         inbrowser=False,
         quiet=False,
-        prevent_thread_lock=False  # Allow proper shutdown
+        # Allow proper shutdown; profiling returns early to time the server start
+        prevent_thread_lock=PROFILE_STARTUP
     )
+    if PROFILE_STARTUP:
+        mark_startup("start server")
+        print_startup_profile()
+        demo.block_thread()
+
+mark_startup("module setup")
 
 if __name__ == "__main__":
+    if "--cli" in sys.argv[1:]:
+        sys.exit(run_cli(sys.argv[1:]))
     if os.name == 'nt':
+        import asyncio
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     launch()
\ No newline at end of file